@@ -0,0 +1,82 @@
+# encoding: utf-8
+"""Measure the memory used per row of a fetched ResultSet.
+
+Usage:
+
+    python benchmarks/memory.py [number of rows]
+
+Rows have three dimensions, one of them in a foreign dialect, that is
+normalized on ingestion, like a typical PXWeb table by municipality.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from statscraper import (BaseScraper, Dataset, Dimension, Result,  # noqa: E402
+                         Datatype)
+
+MUNICIPALITIES = [x.dialects["skatteverket"][0]
+                  for x in Datatype("region").allowed_values
+                  if len((x.dialects.get("skatteverket") or [""])[0]) == 4]
+YEARS = [str(x) for x in range(1968, 2018)]
+GENDERS = ["1", "2"]
+
+
+class BenchmarkScraper(BaseScraper):
+    """Yield a cube of municipalities × years × genders."""
+
+    rows = 100000
+
+    def _fetch_itemslist(self, item):
+        yield Dataset("Dataset")
+
+    def _fetch_dimensions(self, dataset):
+        yield Dimension("Region", datatype="region", dialect="skatteverket")
+        yield Dimension("Tid")
+        yield Dimension("Kon")
+
+    def _fetch_data(self, dataset, query=None):
+        i = 0
+        while True:
+            for municipality in MUNICIPALITIES:
+                for year in YEARS:
+                    for gender in GENDERS:
+                        if i == self.rows:
+                            return
+                        yield Result(i, {
+                            "Region": municipality,
+                            "Tid": year,
+                            "Kon": gender,
+                        })
+                        i += 1
+
+
+def measure(rows, columnar):
+    """Return bytes per row held by a fetched ResultSet."""
+    scraper = BenchmarkScraper()
+    scraper.columnar = columnar
+    scraper.rows = rows
+    dataset = scraper["Dataset"]
+    # Load everything that is not part of the result first
+    dataset.dimensions
+    Datatype("region").allowed_values
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = dataset.fetch()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(data) == rows
+    return float(after - before) / rows
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("Rows: %d" % rows)
+    print("ResultSet:         %6.1f bytes/row" % measure(rows, False))
+    print("ColumnarResultSet: %6.1f bytes/row" % measure(rows, True))
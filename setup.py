@@ -24,6 +24,9 @@ setup(
         "six",
         "requests",
     ],
+    extras_require={
+        "arrow": ["pyarrow"],
+    },
     include_package_data=True,
     download_url="https://github.com/jplusplus/skrejperpark/archive/%s.tar.gz"
                  % version,
@@ -1,14 +1,27 @@
+import copyreg
 import six
 from .compat import unicode
 from .exceptions import NoSuchItem
+from .BaseScraperObject import BaseScraperObject, changes
+
+_MISSING = object()
+INDEX_MIN_SIZE = 16  # Shorter lists are scanned, rather than indexed
 
 
 class BaseScraperList(list):
     """ Lists of dimensions, values, etc all inherit this class
     for some common convenience methods, such as get_by_label()
+
+    Lookups by id, value and label in lists of INDEX_MIN_SIZE items or
+    more use hash indexes, that are kept up to date as items are
+    appended, and rebuilt after any other change to the list, or to the
+    id, value or label of any item. The first matching item is always
+    returned.
     """
 
     _CONTAINS = object
+    # {"id": {}, "value": {}, "label": {}, "identity": {}, "changes": n}
+    _index = None
 
     def get(self, key):
         """Provide alias for bracket notation."""
@@ -18,32 +31,169 @@ class BaseScraperList(list):
         """ Return the first item with a specific label,
         or None.
         """
-        return next((x for x in self if x.label == label), None)
+        return self._lookup("label", label)
 
     def __getitem__(self, key):
         """ Make it possible to get item by id or value identity."""
         if isinstance(key, six.string_types):
-            if isinstance(key, unicode):
-                def f(x):
-                    return (x.id == key)
-            else:
-                def f(x):
-                    return (x.id == unicode(key, encoding="utf-8"))
+            if not isinstance(key, unicode):
+                key = unicode(key, encoding="utf-8")
+            item = self._lookup("id", key)
         elif isinstance(key, self._CONTAINS):
-            def f(x):
-                return (x is key)
+            item = key if self._has_identity(key) else None
         else:
             return list.__getitem__(self, key)
 
-        try:
-            return next(iter(filter(f, self)))
-        except StopIteration:
+        if item is None:
             # No such item
             raise NoSuchItem("No such %s: %s" % (self._CONTAINS.__name__, key))
+        return item
 
     def __contains__(self, item):
         """ Make the 'in' keyword check for value/id """
         if isinstance(item, six.string_types):
-            return bool(len(list(filter(lambda x: x.value == item, self))))
+            return self._lookup("value", item) is not None
+        elif isinstance(item, BaseScraperObject):
+            # BaseScraperObjects are only equal to themselves
+            return self._has_identity(item)
         else:
-            return super(BaseScraperList, self).__contains__(item)
\ No newline at end of file
+            return super(BaseScraperList, self).__contains__(item)
+
+    # Index handling
+
+    def _get_index(self):
+        """Return an up to date index, or None if the list is short."""
+        if len(self) < INDEX_MIN_SIZE:
+            return None
+        # Other threads may throw the index away at any time
+        index = self._index
+        if index is None or index["changes"] != changes[0]:
+            index = self._build_index()
+        return index
+
+    def _build_index(self):
+        index = {"id": {}, "value": {}, "label": {}, "identity": {},
+                 "changes": changes[0]}
+        for x in self:
+            self._index_item(x, index)
+        # Only let other threads see the complete index
+        self._index = index
+        return index
+
+    def _index_item(self, x, index=None):
+        if index is None:
+            index = self._index
+        identity = index["identity"]
+        identity[id(x)] = identity.get(id(x), 0) + 1
+        for attr in ("id", "value", "label"):
+            try:
+                index[attr].setdefault(getattr(x, attr), x)
+            except (AttributeError, TypeError):
+                # Missing or unhashable attribute
+                pass
+
+    def _lookup(self, attr, key):
+        """Return the first item where `attr` equals `key`, or None."""
+        index = self._get_index()
+        if index is not None:
+            try:
+                x = index[attr].get(key)
+            except TypeError:
+                # Unhashable key
+                pass
+            else:
+                if x is None or getattr(x, attr) == key:
+                    return x
+                # Changed behind our back: Index again, and trust that
+                return self._build_index()[attr].get(key)
+        return next((x for x in self if getattr(x, attr, _MISSING) == key),
+                    None)
+
+    def _has_identity(self, item):
+        """Check if this very object is in the list."""
+        index = self._get_index()
+        if index is None:
+            return any(x is item for x in self)
+        return id(item) in index["identity"]
+
+    def __getstate__(self):
+        """Never copy or pickle the index."""
+        state = dict(self.__dict__)
+        state.pop("_index", None)
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            state, items = state
+        else:
+            items = ()
+        self.__dict__.update(state)
+        # The items were added as they were, don't add them again
+        list.extend(self, items)
+
+    def __reduce_ex__(self, protocol):
+        """Pickle (and copy) items with the state, not through extend().
+
+        Subclasses may need their attributes to append items, and those
+        are only set once the items are added, if left to pickle.
+        """
+        return (copyreg.__newobj__, (type(self),),
+                (self.__getstate__(), list(self)))
+
+    # Keep the index up to date
+
+    def append(self, val):
+        super(BaseScraperList, self).append(val)
+        index = self._index
+        if index is not None:
+            self._index_item(val, index)
+
+    def extend(self, iterable):
+        for val in iterable:
+            self.append(val)
+
+    def __iadd__(self, iterable):
+        self.extend(iterable)
+        return self
+
+    def _changed(self):
+        """Throw away the index, after the list was modified."""
+        self._index = None
+
+    def __setitem__(self, key, value):
+        super(BaseScraperList, self).__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super(BaseScraperList, self).__delitem__(key)
+        self._changed()
+
+    def __imul__(self, n):
+        result = super(BaseScraperList, self).__imul__(n)
+        self._changed()
+        return result
+
+    def insert(self, i, val):
+        super(BaseScraperList, self).insert(i, val)
+        self._changed()
+
+    def pop(self, *args):
+        val = super(BaseScraperList, self).pop(*args)
+        self._changed()
+        return val
+
+    def remove(self, val):
+        super(BaseScraperList, self).remove(val)
+        self._changed()
+
+    def clear(self):
+        super(BaseScraperList, self).clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super(BaseScraperList, self).sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super(BaseScraperList, self).reverse()
+        self._changed()
@@ -1,5 +1,17 @@
 import six
 
+# Attributes that BaseScraperLists index items by
+INDEXED_ATTRS = ("id", "_value", "label")
+
+# Counts changes to indexed attributes of existing objects, so that
+# lists can tell if their indexes are out of date. A list, so that it
+# can be shared by reference.
+changes = [0]
+
+
+def _indexed_attr_changed():
+    changes[0] += 1
+
 
 class BaseScraperObject(object):
     """ Objects like items, dimensions, values etc all inherit
@@ -7,6 +19,14 @@ class BaseScraperObject(object):
     BaseScraperList.
     """
 
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        """Tell lists when an id, value or label is changed."""
+        if name in INDEXED_ATTRS and name in getattr(self, "__dict__", ()):
+            _indexed_attr_changed()
+        object.__setattr__(self, name, value)
+
     def get(self, key):
         """Provide alias for bracket notation."""
         return self[key]
@@ -18,9 +38,9 @@ class BaseScraperObject(object):
         a value separate from the id, e.g. DimensionValue,
         that might have something like {id: 'year', value: 2017}
         """
-        if hasattr(self, '_value'):
+        try:
             return self._value
-        else:
+        except AttributeError:
             return self.id
 
     @value.setter
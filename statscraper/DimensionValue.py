@@ -1,23 +1,77 @@
 """This file contanis a class representing a value in a dataset."""
-from .BaseScraperObject import BaseScraperObject
+from .BaseScraperObject import BaseScraperObject, _indexed_attr_changed
 
 
 class DimensionValue(BaseScraperObject):
-    """The value for a dimension inside a Resultset."""
+    """The value for a dimension inside a Resultset.
+
+    Dimension values in a ResultSet are shared by all results with the
+    same value for a dimension, and are frozen. Use copy() to get a
+    DimensionValue that can be modified.
+    """
+
+    # Dimension values are created for every row of a result, so keep
+    # them compact. Subclasses will still get a __dict__ of their own.
+    __slots__ = ("_value", "_dimension", "_label", "_id", "_frozen",
+                 "dialects")
+
+    # Indexed attributes are properties, that keep track of changes
+    # themselves
+    __setattr__ = object.__setattr__
 
     def __init__(self, value, dimension, label=None):
         """Value can be any type. dimension is a Dimension() object."""
+        self._frozen = False
         self.value = value
         self._dimension = dimension
         self._label = label
         self._id = dimension.id
 
+    def _check_frozen(self):
+        if self._frozen:
+            raise AttributeError("This DimensionValue is shared, and can not "
+                                 "be modified. Use copy() to modify it.")
+
+    def freeze(self):
+        """Make this value read only, so that it can be safely shared."""
+        self._frozen = True
+        return self
+
+    def copy(self):
+        """Return a copy that is not frozen."""
+        cls = self.__class__
+        new = cls.__new__(cls)
+        for klass in cls.__mro__:
+            for slot in klass.__dict__.get("__slots__", ()):
+                if hasattr(self, slot):
+                    object.__setattr__(new, slot, getattr(self, slot))
+        if hasattr(self, "__dict__"):
+            new.__dict__.update(self.__dict__)
+        new._frozen = False
+        return new
+
+    def __copy__(self):
+        return self.copy()
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._check_frozen()
+        if hasattr(self, "_value"):
+            _indexed_attr_changed()
+        self._value = value
+
     @property
     def id(self):
         return self._id
 
     @id.setter
     def id(self, value):
+        self._check_frozen()
+        _indexed_attr_changed()
         self._id = value
 
     @property
@@ -26,6 +80,8 @@ class DimensionValue(BaseScraperObject):
 
     @label.setter
     def label(self, value):
+        self._check_frozen()
+        _indexed_attr_changed()
         self._label = value
 
     @property
@@ -34,6 +90,7 @@ class DimensionValue(BaseScraperObject):
 
     @dimension.setter
     def dimension(self, value):
+        self._check_frozen()
         self._dimension = value
 
     def translate(self, dialect):
@@ -43,11 +100,12 @@ class DimensionValue(BaseScraperObject):
 A value must belong to a dimension of a specific datatyp, to be translated. \
 {self.dimension} does not have a datatype.""")
         dt = self.dimension.datatype
+        try:
+            return dt.translation_table(dialect)[self.value]
+        except KeyError:
+            pass
         if self.value not in dt.allowed_values:
             raise Exception(f"""\
 {self.value} is not an allowed value for this datatype, and can not be translated.""")
-
-        translations = dt.allowed_values[self.value]
-        translation = ",".join([x.replace(",", "\\,")
-                               for x in translations.dialects[dialect]])
-        return translation
+        # An allowed value, lacking this dialect
+        raise KeyError(dialect)
@@ -1,5 +1,6 @@
 import six
 from .compat import unicode
+from .exceptions import NoSuchItem
 from .BaseScraperList import BaseScraperList
 from .DimensionValue import DimensionValue
 
@@ -8,32 +9,86 @@ class ValueList(BaseScraperList):
     """A list of dimension values.
 
     allowed_values uses this class, to allow checking membership.
+
+    The allowed values of a datatype are shared by all dimensions using
+    it, and are frozen. Use ValueList(allowed_values) to get a list that
+    can be modified.
     """
 
+    _frozen = False
+
+    def freeze(self):
+        """Make this list read only, so that it can be safely shared."""
+        self._frozen = True
+        return self
+
+    def _check_frozen(self):
+        if self._frozen:
+            raise AttributeError("These values are shared, and can not be "
+                                 "modified. Use ValueList(values) to get a "
+                                 "list that can be.")
+
     def __getitem__(self, key):
         """Make it possible to get value by value or value identity."""
         if isinstance(key, six.string_types):
-            if isinstance(key, unicode):
-                def f(x):
-                    return (x.value == key)
-            else:
-                def f(x):
-                    return (x.value == unicode(key, encoding="utf-8"))
+            if not isinstance(key, unicode):
+                key = unicode(key, encoding="utf-8")
+            val = self._lookup("value", key)
         elif isinstance(key, DimensionValue):
-            def f(x):
-                return (x is key)
+            val = key if self._has_identity(key) else None
         else:
             return list.__getitem__(self, key)
-        try:
-            val = next(iter(filter(f, self)))
-            return val
-        except IndexError:
-            # No such id
-            raise NoSuchItem("No such value")
-
-    def __contains__(self, item):
-        """ in should look for value, not id. """
-        if isinstance(item, six.string_types):
-            return bool(len(list(filter(lambda x: x.value == item, self))))
-        else:
-            return super(ValueList, self).__contains__(item)
+        if val is None:
+            # No such value
+            raise NoSuchItem("No such value: %s" % key)
+        return val
+
+    # Frozen lists can not be modified
+
+    def append(self, val):
+        self._check_frozen()
+        super(ValueList, self).append(val)
+
+    def extend(self, iterable):
+        self._check_frozen()
+        super(ValueList, self).extend(iterable)
+
+    def __iadd__(self, iterable):
+        self._check_frozen()
+        return super(ValueList, self).__iadd__(iterable)
+
+    def __setitem__(self, key, value):
+        self._check_frozen()
+        super(ValueList, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._check_frozen()
+        super(ValueList, self).__delitem__(key)
+
+    def __imul__(self, n):
+        self._check_frozen()
+        return super(ValueList, self).__imul__(n)
+
+    def insert(self, i, val):
+        self._check_frozen()
+        super(ValueList, self).insert(i, val)
+
+    def pop(self, *args):
+        self._check_frozen()
+        return super(ValueList, self).pop(*args)
+
+    def remove(self, val):
+        self._check_frozen()
+        super(ValueList, self).remove(val)
+
+    def clear(self):
+        self._check_frozen()
+        super(ValueList, self).clear()
+
+    def sort(self, *args, **kwargs):
+        self._check_frozen()
+        super(ValueList, self).sort(*args, **kwargs)
+
+    def reverse(self):
+        self._check_frozen()
+        super(ValueList, self).reverse()
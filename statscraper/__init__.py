@@ -7,8 +7,12 @@ from .BaseScraperList import BaseScraperList
 from .BaseScraperObject import BaseScraperObject
 from .ValueList import ValueList
 from .datatypes import Datatype
+from .cache import (ResultCache, SQLiteResultCache, SQLiteHTTPCache,
+					 FileHTTPCache)
+from .transport import Transport, RateLimiter
 from .base_scraper import (BaseScraper, Item, Collection, Dataset, Result,
-						   ResultSet, ItemList, Dimension, DimensionList)
+						   ResultSet, ColumnarResultSet,
+						   ItemList, Dimension, DimensionList)
 
 # Contants
 from .base_scraper import ROOT, TYPE_DATASET, TYPE_COLLECTION
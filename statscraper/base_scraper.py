@@ -18,6 +18,12 @@ u"""
   * _fetch_dimensions(dataset) yields dimensions available on a dataset
   * _fetch_data(dataset) syield rows from a dataset
 
+ Each of them has an async counterpart (_afetch_itemslist, _afetch_dimensions
+ and _afetch_data), used by Collection.aitems(), Dataset.afetch() and
+ Dataset.afetch_next(). By default these run the sync methods in worker
+ threads. Scrapers making many requests per dataset can override them, to
+ make their requests at the same time, with `await self.transport.aget(url)`.
+
  A number of hooks are avaiable for more advanced scrapers. These are called
  by adding the on decorator on a method:
 
@@ -25,19 +31,30 @@ u"""
   def my_method(self):
     # Do something when the cusor moves up one level
 
+ Hooks belong to the class they are defined in, and its subclasses.
+
 """
+import copyreg
 import six
 from hashlib import md5
-from json import dumps
+from json import dumps, loads
+import numpy as np
 import pandas as pd
-from collections import deque
+from array import array
+from collections import deque, OrderedDict
 from copy import copy
+from itertools import islice
+from sys import getsizeof
+from threading import local, RLock
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from .exceptions import NoSuchItem, InvalidID
-from .datatypes import Datatype
+from .datatypes import Datatype, build_dialect_index, detect_dialect
 from .BaseScraperObject import BaseScraperObject
 from .BaseScraperList import BaseScraperList
 from .DimensionValue import DimensionValue
 from .ValueList import ValueList
+from .cache import ResultCache
+from .transport import Transport
 
 if six.PY3:
     unicode = str
@@ -51,6 +68,8 @@ TYPE_DATASET = "Dataset"
 TYPE_COLLECTION = "Collection"
 ROOT = "<root>"  # Special id for root position
 VALUE_KEY = "value"  # key/column holding the value of a result or dimension
+MISSING = -1  # Code for a dimension missing from a row, in coded columns
+ARROW_METADATA_KEY = "statscraper"  # Arrow schema metadata key
 """ Constants for item types and id's """
 
 
@@ -61,6 +80,7 @@ class ResultSet(list):
     """
 
     _pandas = None
+    _plan = None  # IngestionPlan, compiled on first append
     dataset = None
 
     @property
@@ -70,23 +90,305 @@ class ResultSet(list):
 
     @property
     def pandas(self):
-        """Return a Pandas dataframe."""
+        """Return a Pandas dataframe.
+
+        The frame is built column by column, with dimensions as
+        categoricals (see `_categorical`).
+        """
         if self._pandas is None:
-            self._pandas = pd.DataFrame().from_records(self.list_of_dicts)
+            values, dimensions = self._coded_columns()
+            columns = OrderedDict([(VALUE_KEY, values)])
+            for id_, (dimension, dictionary, codes) in dimensions.items():
+                columns[id_] = _categorical(dimension, dictionary, codes)
+            self._pandas = pd.DataFrame(columns)
         return self._pandas
 
+    def _coded_columns(self):
+        """Return all values, and every dimension as a coded column.
+
+        Dimensions are returned as an ordered dict of
+        dimension id -> (dimension, distinct values, codes), where codes
+        are positions in the list of distinct values, or MISSING.
+        """
+        size = len(self)
+        values = []
+        dimensions = OrderedDict()
+        for row, result in enumerate(self):
+            values.append(result.value)
+            for dv in result.dimensionvalues:
+                entry = dimensions.get(dv.id)
+                if entry is None:
+                    entry = (dv.dimension, OrderedDict(),
+                             array("l", [MISSING]) * size)
+                    dimensions[dv.id] = entry
+                dictionary = entry[1]
+                code = dictionary.get(dv.value)
+                if code is None:
+                    code = dictionary[dv.value] = len(dictionary)
+                entry[2][row] = code
+        return values, OrderedDict((k, (d, list(dictionary), codes))
+                                   for k, (d, dictionary, codes)
+                                   in dimensions.items())
+
+    def to_arrow(self):
+        """Return a pyarrow Table.
+
+        Dimensions are stored as dictionary encoded columns. The id,
+        label, datatype and dialect of each dimension are kept in the
+        schema metadata. Requires pyarrow.
+        """
+        pa = _import_pyarrow()
+        values, dimensions = self._coded_columns()
+        try:
+            arrays = [pa.array(values)]
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed types. Keep them as strings
+            arrays = [pa.array([None if v is None else unicode(v)
+                                for v in values], pa.string())]
+        names = [VALUE_KEY]
+        described = []
+        for id_, (dimension, dictionary, codes) in dimensions.items():
+            codes = np.asarray(codes, dtype=np.int32)
+            indices = pa.array(codes, mask=codes == MISSING)
+            dictionary = pa.array([unicode(v) for v in dictionary],
+                                  pa.string())
+            arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+            names.append(id_)
+            described.append(_describe_dimension(id_, dimension))
+        metadata = {
+            "dialect": getattr(self, "dialect", None),
+            "dimensions": described,
+        }
+        return pa.Table.from_arrays(arrays, names=names, metadata={
+            ARROW_METADATA_KEY: dumps(metadata),
+        })
+
+    def to_parquet(self, path, **kwargs):
+        """Write all results to a Parquet file. Requires pyarrow.
+
+        Any keyword arguments are passed on to pyarrow.parquet.write_table.
+        """
+        pa = _import_pyarrow()
+        pa.parquet.write_table(self.to_arrow(), path, **kwargs)
+
+    @classmethod
+    def from_arrow(cls, table, dataset=None):
+        """Create a ResultSet from a pyarrow Table made by to_arrow().
+
+        Dimensions are taken from the dataset, if given (and the kind of
+        ResultSet is then the one its scraper asks for), or else
+        recreated from the schema metadata. Each distinct dimension
+        value is only decoded once.
+        """
+        metadata = (table.schema.metadata or {}).get(
+            ARROW_METADATA_KEY.encode("utf-8"))
+        metadata = loads(metadata) if metadata else {}
+        if dataset is not None:
+            rs = dataset._new_resultset()
+            plan = dataset._compile_plan(normalize=False)
+        else:
+            rs = cls()
+            rs.dialect = metadata.get("dialect")
+            plan = IngestionPlan([_dimension_from_description(x)
+                                  for x in metadata.get("dimensions", [])],
+                                 normalize=False)
+
+        columns = OrderedDict()
+        for id_ in table.column_names:
+            if id_ == VALUE_KEY:
+                continue
+            dvs = []
+            positions = {}
+            chunks = []
+            for chunk in table.column(id_).chunks:
+                if not hasattr(chunk, "dictionary"):
+                    chunk = chunk.dictionary_encode()
+                # Map the dictionary of this chunk to our own
+                remap = []
+                for value in chunk.dictionary.to_pylist():
+                    if value not in positions:
+                        positions[value] = len(dvs)
+                        dvs.append(next(plan.dimensionvalues({id_: value})))
+                    remap.append(positions[value])
+                remap = np.array(remap + [MISSING], dtype=np.int64)
+                indices = chunk.indices.fill_null(MISSING)
+                chunks.append(remap[indices.to_numpy(zero_copy_only=False)])
+            codes = np.concatenate(chunks) if chunks \
+                else np.array([], dtype=np.int64)
+            columns[id_] = (dvs, codes)
+
+        rs._load_columns(table.column(VALUE_KEY).to_pylist(), columns, plan)
+        return rs
+
+    @classmethod
+    def from_parquet(cls, path, dataset=None):
+        """Read a ResultSet from a Parquet file made by to_parquet().
+
+        The file is memory mapped. See `from_arrow`. Requires pyarrow.
+        """
+        pa = _import_pyarrow()
+        table = pa.parquet.read_table(path, memory_map=True)
+        return cls.from_arrow(table, dataset=dataset)
+
+    def _load_columns(self, values, columns, plan):
+        """Add results from decoded columns (see `from_arrow`).
+
+        `columns` maps dimension ids to (DimensionValues, codes).
+        """
+        decoded = [(id_, dvs, codes.tolist())
+                   for id_, (dvs, codes) in columns.items()]
+
+        def results():
+            for row, value in enumerate(values):
+                result = Result(value, {})
+                for id_, dvs, codes in decoded:
+                    code = codes[row]
+                    if code != MISSING:
+                        result.raw_dimensions[id_] = dvs[code].value
+                yield result
+
+        self._plan = plan
+        self.extend(results())
+        self._plan = None
+
+    def _to_records(self):
+        """Return all results as (value, {dimension: value}) tuples."""
+        return [x.tuple for x in self]
+
+    @classmethod
+    def _from_records(cls, records, dataset=None):
+        """Recreate a ResultSet from tuples returned by _to_records().
+
+        Values are already normalized, and will not be normalized again.
+        """
+        if dataset is not None:
+            rs = dataset._new_resultset()
+            plan = dataset._compile_plan(normalize=False)
+        else:
+            rs = cls()
+            plan = IngestionPlan([], normalize=False)
+        rs._plan = plan
+        rs.extend(Result(value, dimensions) for value, dimensions in records)
+        # Anything appended from now on should be normalized
+        rs._plan = None
+        return rs
+
+    @property
+    def nbytes(self):
+        """Return the approximate memory used by these results.
+
+        The size of a row is estimated from a sample of rows.
+        """
+        size = getsizeof(self)
+        if len(self):
+            sample = _sample(self)
+            row_size = sum(getsizeof(x) + getsizeof(x.value) +
+                           getsizeof(x.raw_dimensions) +
+                           getsizeof(x.dimensionvalues)
+                           for x in sample) / float(len(sample))
+            size += int(row_size * len(self))
+        return size
+
     def translate(self, dialect):
-        """Return a copy of this ResultSet in a different dialect."""
-        new_resultset = copy(self)
-        new_resultset.dialect = dialect
+        """Return a copy of this ResultSet in a different dialect.
 
-        for result in new_resultset:
-            for dimensionvalue in result.dimensionvalues:
-                dimensionvalue.value = dimensionvalue.translate(dialect)
+        The distinct values of all dimensions are translated in bulk
+        (see `_translate_dimensionvalues`), and the translations are
+        shared by the results in the new ResultSet. The original results
+        are left as they are.
+        """
+        # Distinct dimension values, by (dimension id, value)
+        distinct = OrderedDict()
+        for result in self:
+            for dv in result.dimensionvalues:
+                distinct.setdefault((dv.id, dv.value), dv)
+        translations = dict(zip(distinct, _translate_dimensionvalues(
+            list(distinct.values()), dialect)))
+
+        new_resultset = ResultSet()
+        new_resultset.__dict__.update(self.__dict__)
+        new_resultset._pandas = None
+        new_resultset.dialect = dialect
+        for result in self:
+            new_result = copy(result)
+            new_result.resultset = new_resultset
+            new_result.dimensionvalues = DimensionList(
+                translations[(dv.id, dv.value)]
+                for dv in result.dimensionvalues)
+            list.append(new_resultset, new_result)
+            new_resultset.dimensionvalues = new_result.dimensionvalues
         return new_resultset
 
+    def detect_dialect(self, id_, sample=1000, apply=False):
+        """Guess the datatype and dialect of the values of a dimension.
+
+        Returns a list of (Datatype, dialect, coverage) candidates, best
+        first (see `datatypes.detect_dialect`). With apply=True, the best
+        candidate, if any, is also applied, using `apply_dialect`.
+        """
+        dimensions = self._coded_columns()[1]
+        if id_ not in dimensions:
+            raise NoSuchItem("No such dimension: %s" % id_)
+        candidates = detect_dialect(dimensions[id_][1], sample=sample)
+        if apply and candidates:
+            datatype, dialect, coverage = candidates[0]
+            self.apply_dialect(id_, datatype, dialect)
+        return candidates
+
+    def apply_dialect(self, id_, datatype, dialect):
+        """Normalize the values of a dimension from a dialect, in bulk.
+
+        The dimension gets the datatype and dialect, so that results
+        fetched later are normalized too. Values that are not found in
+        the dialect are kept as they are.
+        """
+        dimension = self._column_dimension(id_)
+        _set_dialect(dimension, datatype, dialect)
+        # Normalize anything appended from now on with the new dialect
+        self._plan = None
+        translations = {}
+        for result in self:
+            dvs = result.dimensionvalues
+            for i, dv in enumerate(dvs):
+                if dv.id == id_:
+                    if dv.value not in translations:
+                        translations[dv.value] = _normalize_dimensionvalue(
+                            dv, dimension)
+                    dvs[i] = translations[dv.value]
+        self._pandas = None
+
+    def _column_dimension(self, id_):
+        """Return the dimension of the values in a column."""
+        for result in self:
+            for dv in result.dimensionvalues:
+                if dv.id == id_:
+                    return dv.dimension
+        raise NoSuchItem("No such dimension: %s" % id_)
+
     def append(self, val):
-        """Connect any new results to the resultset.
+        """Connect any new results to the resultset."""
+        self._attach(val, self._get_plan())
+        super(ResultSet, self).append(val)
+        self._pandas = None
+
+    def extend(self, iterable):
+        """Connect a number of new results to the resultset."""
+        plan = self._get_plan()
+        attach = self._attach
+        add = super(ResultSet, self).append
+        for val in iterable:
+            attach(val, plan)
+            add(val)
+        self._pandas = None
+
+    def _get_plan(self):
+        """Return the IngestionPlan of our dataset, if any."""
+        if self._plan is None and self.dataset:
+            self._plan = self.dataset._compile_plan()
+        return self._plan
+
+    def _attach(self, val, plan):
+        """Prepare a result for being added to this resultset.
 
         This is where all the heavy lifting is done for creating results:
          - We add a datatype here, so that each result can handle
@@ -100,44 +402,592 @@ class ResultSet(list):
         val.dataset = self.dataset
 
         # Check result dimensions against available dimensions for this dataset
-        if val.dataset:
-            dataset_dimensions = self.dataset.dimensions
-            for k, v in val.raw_dimensions.items():
-                if k not in dataset_dimensions:
-                    d = Dimension(k)
-                else:
-                    d = dataset_dimensions[k]
-
-                # Normalize if we have a datatype and a foreign dialect
-                normalized_value = unicode(v)
-                if d.dialect and d.datatype:
-                    if d.dialect in d.datatype.dialects:
-                        for av in d.allowed_values:
-                            # Not all allowed_value have all dialects
-                            if unicode(v) in av.dialects.get(d.dialect, []):
-                                normalized_value = av.value
-                                # Use first match
-                                # We do not support multiple matches
-                                # This is by design.
-                                break
-
-                # Create DimensionValue object
-                if isinstance(v, DimensionValue):
-                    dim = v
-                    v.value = normalized_value
-                else:
-                    if k in dataset_dimensions:
-                        dim = DimensionValue(normalized_value, d)
-                    else:
-                        dim = DimensionValue(normalized_value, Dimension())
-
-                val.dimensionvalues.append(dim)
+        if plan is not None:
+            val.dimensionvalues.extend(plan.dimensionvalues(val.raw_dimensions))
 
             # Add last list of dimension values to the ResultSet
             # They will usually be the same for each result
             self.dimensionvalues = val.dimensionvalues
 
-        super(ResultSet, self).append(val)
+
+def _sample(rows, size=100):
+    """Return up to `size` rows, evenly spread."""
+    step = max(1, len(rows) // size)
+    return [rows[i] for i in range(0, len(rows), step)][:size]
+
+
+def _set_dialect(dimension, datatype, dialect):
+    """Give a dimension a (new) datatype and dialect."""
+    if not isinstance(datatype, Datatype):
+        datatype = Datatype(datatype)
+    dimension.datatype = datatype
+    dimension.dialect = dialect
+    # The dialect index is built again, on first use
+    dimension._dialect_index = None
+
+
+def _normalize_dimensionvalue(dv, dimension):
+    """Return a frozen dimension value, normalized from dimension's dialect.
+
+    Values not found in the dialect keep their value.
+    """
+    match = dimension.dialect_index.get(dv.value)
+    value = dv.value if match is None else match.value
+    return DimensionValue(value, dimension, label=dv.label).freeze()
+
+
+def _translate_dimensionvalues(dvs, dialect):
+    """Return frozen translations of a list of dimension values.
+
+    Values are translated in bulk, one dimension at a time, through the
+    translation table of its datatype (see `Datatype.translate_many`).
+    """
+    dimensions = OrderedDict()  # id(dimension) -> positions in dvs
+    for i, dv in enumerate(dvs):
+        dimensions.setdefault(id(dv.dimension), []).append(i)
+
+    translated = [None] * len(dvs)
+    for positions in dimensions.values():
+        datatype = dvs[positions[0]].dimension.datatype
+        if datatype is None:
+            values = [None] * len(positions)
+        else:
+            values = datatype.translate_many([dvs[i].value for i in positions],
+                                             dialect, default=None)
+        for i, value in zip(positions, values):
+            dv = dvs[i]
+            if value is None:
+                # Let the value itself raise a helpful error
+                value = dv.translate(dialect)
+            translated[i] = DimensionValue(value, dv.dimension,
+                                           label=dv.label).freeze()
+    return translated
+
+
+def _import_pyarrow():
+    """Import pyarrow, which is only needed for Arrow and Parquet files."""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError("Arrow and Parquet support requires pyarrow. "
+                          "Install it with `pip install pyarrow`.")
+    return pyarrow
+
+
+def _describe_dimension(id_, dimension):
+    """Return a dimension as a dict, for storing as Arrow metadata."""
+    datatype = getattr(dimension, "datatype", None)
+    return {
+        "id": id_,
+        "label": getattr(dimension, "label", id_),
+        "datatype": datatype.id if datatype else None,
+        "dialect": getattr(dimension, "dialect", None),
+    }
+
+
+def _dimension_from_description(description):
+    """Recreate a dimension from _describe_dimension()."""
+    return Dimension(description["id"],
+                     label=description.get("label"),
+                     datatype=description.get("datatype"),
+                     dialect=description.get("dialect"))
+
+
+def _categorical(dimension, values, codes):
+    """Return a pandas Categorical for a dimension column.
+
+    `values` are the distinct values found in the column, and `codes`
+    the position of each row's value in `values` (or MISSING). The
+    allowed values of the dimension are used as categories, followed
+    by any other values found, as long as the allowed values can be
+    had without asking the scraper for them. Categories are coerced to
+    the value_type of the dimension's datatype, if possible.
+    """
+    categories = []
+    datatype = dimension.datatype if dimension is not None else None
+    if datatype or getattr(dimension, "_allowed_values", None) is not None:
+        categories = [av.value for av in dimension.allowed_values]
+    positions = {}
+    for i, category in enumerate(categories):
+        positions.setdefault(category, i)
+    if len(positions) < len(categories):
+        categories = list(positions)
+    for value in values:
+        if value not in positions:
+            positions[value] = len(categories)
+            categories.append(value)
+
+    # The last entry maps MISSING (-1) to itself
+    remap = np.array([positions[v] for v in values] + [MISSING])
+    codes = remap[np.asarray(codes, dtype=np.int64)]
+
+    value_type = datatype.value_type if datatype else None
+    categories = _coerce(categories, value_type)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _coerce(values, value_type):
+    """Return values as a pandas Index of the dtype implied by value_type.
+
+    Values that cannot be converted are kept as they are.
+    """
+    index = pd.Index(values, dtype=object)
+    try:
+        if value_type == "int":
+            coerced = pd.Index(pd.to_numeric(index))
+            if coerced.dtype.kind != "i":
+                return index
+        elif value_type == "float":
+            coerced = pd.Index(pd.to_numeric(index).astype(float))
+        elif value_type == "date":
+            coerced = pd.DatetimeIndex(pd.to_datetime(index))
+        else:
+            return index
+    except (ValueError, TypeError):
+        return index
+    if not coerced.is_unique or coerced.hasnans:
+        # e.g. "01" and "1" would collapse into the same category
+        return index
+    return coerced
+
+
+class ColumnarResultSet(ResultSet):
+    """A ResultSet stored column by column.
+
+    Instead of keeping one Result object (with its own dimension values)
+    per row, values are kept in a single list, and each dimension is
+    stored as an array of integer codes, pointing into a dictionary of
+    distinct dimension values shared by all rows. This keeps large
+    results compact in memory.
+
+    Result objects are only created as lightweight views, when a row is
+    accessed. Use it by setting `columnar = True` on a scraper.
+    """
+
+    MISSING = MISSING  # Code used for rows that lack a dimension
+
+    def __init__(self, iterable=()):
+        super(ColumnarResultSet, self).__init__()
+        self._values = []
+        self._columns = OrderedDict()  # dimension id -> array of codes
+        self._dictionaries = {}  # dimension id -> list of DimensionValues
+        self._codes = {}  # dimension id -> {value: code}
+        self.extend(iterable)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        for i in range(len(self._values)):
+            yield self._row(i)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reversed__(self):
+        for i in reversed(range(len(self._values))):
+            yield self._row(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            # A resultset of the same kind
+            new_resultset = copy(self)
+            new_resultset._values = self._values[key]
+            for id_, column in self._columns.items():
+                new_resultset._columns[id_] = column[key]
+            return new_resultset
+        return self._row(self._position(key))
+
+    def _position(self, key):
+        """Return a non-negative row number, or raise IndexError."""
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("ColumnarResultSet index out of range")
+        return key
+
+    def __eq__(self, other):
+        """Compare values and dimension values, row by row."""
+        if isinstance(other, ResultSet):
+            return len(self) == len(other) and \
+                self.list_of_dicts == other.list_of_dicts
+        if isinstance(other, list):
+            return len(self) == len(other) and \
+                all(self._matches(i, x) for i, x in enumerate(other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def _matches(self, i, val):
+        """Check if row i equals a result (or a value, as Result does)."""
+        if isinstance(val, Result):
+            return self._row(i).tuple == val.tuple
+        return self._row(i) == val
+
+    def __contains__(self, val):
+        return any(self._matches(i, val) for i in range(len(self)))
+
+    def index(self, val, start=0, stop=None):
+        """Return the first row number of a result equal to val."""
+        for i in range(*slice(start, stop).indices(len(self))):
+            if self._matches(i, val):
+                return i
+        raise ValueError("%r is not in ColumnarResultSet" % (val,))
+
+    def count(self, val):
+        return sum(1 for i in range(len(self)) if self._matches(i, val))
+
+    # Modifying rows other than at the end is done by encoding all rows
+    # again. Results added are connected to the resultset first.
+
+    def _replace_rows(self, rows):
+        """Store these (already attached) results instead of ours."""
+        rows = list(rows)
+        self._values = []
+        self._columns = OrderedDict()
+        self._dictionaries = {}
+        self._codes = {}
+        for val in rows:
+            self._encode(val)
+        self._pandas = None
+
+    def _attached(self, vals):
+        plan = self._get_plan()
+        for val in vals:
+            self._attach(val, plan)
+            yield val
+
+    def __setitem__(self, key, val):
+        rows = list(self)
+        if isinstance(key, slice):
+            rows[key] = list(self._attached(val))
+        else:
+            rows[self._position(key)] = next(self._attached([val]))
+        self._replace_rows(rows)
+
+    def __delitem__(self, key):
+        if not isinstance(key, slice):
+            key = self._position(key)
+        del self._values[key]
+        for column in self._columns.values():
+            del column[key]
+        self._pandas = None
+
+    def insert(self, i, val):
+        rows = list(self)
+        rows.insert(i, next(self._attached([val])))
+        self._replace_rows(rows)
+
+    def pop(self, i=-1):
+        val = self[i]
+        del self[i]
+        return val
+
+    def remove(self, val):
+        del self[self.index(val)]
+
+    def clear(self):
+        self._replace_rows([])
+
+    def reverse(self):
+        self._values.reverse()
+        for column in self._columns.values():
+            column.reverse()
+        self._pandas = None
+
+    def sort(self, key=None, reverse=False):
+        self._replace_rows(sorted(self, key=key, reverse=reverse))
+
+    def __iadd__(self, iterable):
+        self.extend(iterable)
+        return self
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __mul__(self, n):
+        return list(self) * n
+
+    __rmul__ = __mul__
+
+    def __imul__(self, n):
+        self._replace_rows(list(self) * n)
+        return self
+
+    def copy(self):
+        return copy(self)
+
+    def __copy__(self):
+        new_resultset = type(self)()
+        new_resultset.__dict__.update(self.__dict__)
+        new_resultset._values = list(self._values)
+        new_resultset._columns = OrderedDict(
+            (k, array("l", v)) for k, v in self._columns.items())
+        new_resultset._dictionaries = {k: list(v)
+                                       for k, v in self._dictionaries.items()}
+        new_resultset._codes = {k: dict(v) for k, v in self._codes.items()}
+        new_resultset._pandas = None
+        return new_resultset
+
+    def __reduce_ex__(self, protocol):
+        """Pickle (and deep copy) the columns only.
+
+        Rows are views of the columns, and must not be added again
+        through extend().
+        """
+        state = dict(self.__dict__)
+        state["_pandas"] = None
+        return (copyreg.__newobj__, (type(self),), state)
+
+    def append(self, val):
+        """Encode a result into the columns of this resultset."""
+        self._attach(val, self._get_plan())
+        self._encode(val)
+
+    def extend(self, iterable):
+        """Encode a number of results into the columns of this resultset."""
+        plan = self._get_plan()
+        for val in iterable:
+            self._attach(val, plan)
+            self._encode(val)
+
+    def _encode(self, val):
+        """Add the value and dimension codes of an attached result."""
+        row = len(self._values)
+        self._values.append(val.value)
+        for dv in val.dimensionvalues:
+            column = self._columns.get(dv.id)
+            if column is None:
+                # A new dimension: Earlier rows lack it
+                column = array("l", [self.MISSING]) * row
+                self._columns[dv.id] = column
+                self._dictionaries[dv.id] = []
+                self._codes[dv.id] = {}
+            codes = self._codes[dv.id]
+            code = codes.get(dv.value)
+            if code is None:
+                code = len(self._dictionaries[dv.id])
+                codes[dv.value] = code
+                self._dictionaries[dv.id].append(dv)
+            if len(column) > row:
+                # Same dimension twice in one row: Last one wins
+                column[row] = code
+            else:
+                column.append(code)
+        # Pad dimensions that this row did not have
+        for column in self._columns.values():
+            if len(column) == row:
+                column.append(self.MISSING)
+        self._pandas = None
+
+    @property
+    def nbytes(self):
+        """Return the approximate memory used by these results."""
+        size = getsizeof(self) + getsizeof(self._values)
+        if self._values:
+            sample = _sample(self._values)
+            value_size = sum(getsizeof(x) for x in sample) / float(len(sample))
+            size += int(value_size * len(self._values))
+        for id_, column in self._columns.items():
+            size += getsizeof(column)
+            size += sum(getsizeof(dv) + getsizeof(dv.value)
+                        for dv in self._dictionaries[id_])
+        return size
+
+    def _to_records(self):
+        """Return all results as (value, {dimension: value}) tuples."""
+        records = []
+        for row in self.list_of_dicts:
+            value = row.pop(VALUE_KEY)
+            records.append((value, row))
+        return records
+
+    def _row(self, i):
+        """Return a Result view of row i."""
+        result = Result(self._values[i], {})
+        for id_, column in self._columns.items():
+            code = column[i]
+            if code != self.MISSING:
+                dv = self._dictionaries[id_][code]
+                result.raw_dimensions[id_] = dv.value
+                result.dimensionvalues.append(dv)
+        result.resultset = self
+        result.dataset = self.dataset
+        return result
+
+    def column(self, id_):
+        """Return all values of a dimension, or None for missing values."""
+        if id_ == VALUE_KEY:
+            return list(self._values)
+        dictionary = [dv.value for dv in self._dictionaries[id_]]
+        return [dictionary[c] if c != self.MISSING else None
+                for c in self._columns[id_]]
+
+    @property
+    def list_of_dicts(self):
+        """Return a list of dictionaries, with the key "value" for values."""
+        dictionaries = {k: [dv.value for dv in v]
+                        for k, v in self._dictionaries.items()}
+        rows = [{VALUE_KEY: v} for v in self._values]
+        for id_, column in self._columns.items():
+            dictionary = dictionaries[id_]
+            for row, code in zip(rows, column):
+                if code != self.MISSING:
+                    row[id_] = dictionary[code]
+        return rows
+
+    def _coded_columns(self):
+        """Return all values, and every dimension as a coded column."""
+        dimensions = OrderedDict()
+        for id_, codes in self._columns.items():
+            dictionary = self._dictionaries[id_]
+            dimension = dictionary[0].dimension if dictionary \
+                else Dimension(id_)
+            dimensions[id_] = (dimension, [dv.value for dv in dictionary],
+                               codes)
+        return self._values, dimensions
+
+    def _load_columns(self, values, columns, plan):
+        """Add results from decoded columns, without creating any rows."""
+        if len(self):
+            return super(ColumnarResultSet, self)._load_columns(values,
+                                                                columns, plan)
+        self._values = list(values)
+        for id_, (dvs, codes) in columns.items():
+            column = array("l")
+            column.frombytes(np.asarray(codes, dtype="l").tobytes())
+            self._columns[id_] = column
+            self._dictionaries[id_] = list(dvs)
+            self._codes[id_] = {dv.value: i for i, dv in enumerate(dvs)}
+        self._pandas = None
+
+    def apply_dialect(self, id_, datatype, dialect):
+        """Normalize the values of a dimension from a dialect, in bulk.
+
+        Only the distinct values of the dimension are normalized.
+        """
+        dimension = self._column_dimension(id_)
+        _set_dialect(dimension, datatype, dialect)
+        self._plan = None
+        dictionary = self._dictionaries[id_]
+        new_dictionary = []
+        codes = {}
+        remap = []
+        for dv in dictionary:
+            new_dv = _normalize_dimensionvalue(dv, dimension)
+            if new_dv.value not in codes:
+                codes[new_dv.value] = len(new_dictionary)
+                new_dictionary.append(new_dv)
+            remap.append(codes[new_dv.value])
+        remap = np.array(remap + [MISSING], dtype="l")
+        column = array("l")
+        column.frombytes(remap[np.asarray(self._columns[id_], dtype="l")]
+                         .tobytes())
+        self._columns[id_] = column
+        self._dictionaries[id_] = new_dictionary
+        self._codes[id_] = codes
+        self._pandas = None
+
+    def _column_dimension(self, id_):
+        """Return the dimension of the values in a column."""
+        if not self._dictionaries.get(id_):
+            raise NoSuchItem("No such dimension: %s" % id_)
+        return self._dictionaries[id_][0].dimension
+
+    def translate(self, dialect):
+        """Return a copy of this ResultSet in a different dialect.
+
+        Only the distinct values of each dimension are translated.
+        """
+        new_resultset = copy(self)
+        new_resultset.dialect = dialect
+        for id_, dictionary in new_resultset._dictionaries.items():
+            translated = _translate_dimensionvalues(dictionary, dialect)
+            new_resultset._dictionaries[id_] = translated
+            new_resultset._codes[id_] = {dv.value: i
+                                         for i, dv in enumerate(translated)}
+        return new_resultset
+
+
+class IngestionPlan(object):
+    """Instructions for turning raw result dimensions into dimension values.
+
+    A plan is compiled once per fetch (see `Dataset._compile_plan`), so
+    that the dimensions of a dataset are only looked up, and their
+    normalizers only set up, once, rather than for every row.
+    """
+
+    def __init__(self, dimensions, normalize=True):
+        """Dimensions is a list of the dimensions of a dataset.
+
+        Use normalize=False for values that are already normalized.
+        """
+        self._steps = {}
+        for d in dimensions:
+            if d.id not in self._steps:
+                # Use first match, like DimensionList does
+                normalizer = self._normalizer(d) if normalize else unicode
+                self._steps[d.id] = (d, normalizer, {})
+
+    def _step(self, key):
+        """Return the (dimension, normalizer, values) for a dimension id.
+
+        `values` holds one shared DimensionValue per normalized value.
+        """
+        try:
+            return self._steps[key]
+        except KeyError:
+            # Unknown dimension: Create one, and reuse it for other rows
+            step = self._steps[key] = (Dimension(key), unicode, {})
+            return step
+
+    def _normalizer(self, dimension):
+        """Return a function normalizing raw values for a dimension."""
+        index = dimension.dialect_index
+        if not index:
+            return unicode
+
+        # Raw values already normalized
+        normalized = {}
+
+        def normalize(value):
+            value = unicode(value)
+            try:
+                return normalized[value]
+            except KeyError:
+                match = index.get(value)
+                normalized[value] = value if match is None else match.value
+                return normalized[value]
+        return normalize
+
+    def dimensionvalues(self, raw_dimensions):
+        """Yield normalized DimensionValues for a dict of raw dimensions.
+
+        Results with the same value for a dimension will share the same
+        (frozen) DimensionValue.
+        """
+        step = self._step
+        for k, v in raw_dimensions.items():
+            d, normalize, values = step(k)
+            normalized_value = normalize(v)
+            if isinstance(v, DimensionValue):
+                # Yielded by the scraper: Never modify it
+                if v.value != normalized_value:
+                    v = v.copy()
+                    v.value = normalized_value
+                yield v
+            else:
+                try:
+                    yield values[normalized_value]
+                except KeyError:
+                    dv = DimensionValue(normalized_value, d).freeze()
+                    values[normalized_value] = dv
+                    yield dv
 
 
 class DimensionList(BaseScraperList):
@@ -153,6 +1003,13 @@ class Result(BaseScraperObject):
     and optionally a set of dimensions with values.
     """
 
+    # There is one Result per row, so keep them compact
+    __slots__ = ("_value", "label", "raw_dimensions", "dimensionvalues",
+                 "resultset", "dataset")
+
+    # Results are not kept in indexed lists
+    __setattr__ = object.__setattr__
+
     def __init__(self, value, dimensions={}):
         """Value is supposed, but not strictly required to be numerical."""
         self.value = value
@@ -219,9 +1076,10 @@ class Dimension(BaseScraperObject):
         else:
             self.label = label
         if datatype:
+            # Allowed values are loaded from the datatype on first use
             self.datatype = Datatype(datatype)
-            self._allowed_values = self.datatype.allowed_values
         self.dialect = dialect
+        self._dialect_index = None
         if allowed_values:
             # Override allowed values from datatype, if any
             #
@@ -239,16 +1097,53 @@ class Dimension(BaseScraperObject):
     @property
     def allowed_values(self):
         """Return a list of allowed values."""
-        if self._allowed_values is None:
-            self._allowed_values = ValueList()
-            for val in self.scraper._fetch_allowed_values(self):
-                if isinstance(val, DimensionValue):
-                    self._allowed_values.append(val)
-                else:
-                    self._allowed_values.append(DimensionValue(val,
-                                                               Dimension()))
+        if self._allowed_values is None and self.datatype is not None:
+            self._allowed_values = self.datatype.allowed_values
+        elif self._allowed_values is None:
+            with self._loading_lock:
+                if self._allowed_values is None:
+                    allowed_values = ValueList()
+                    for val in self.scraper._fetch_allowed_values(self):
+                        if not isinstance(val, DimensionValue):
+                            val = DimensionValue(val, Dimension())
+                        allowed_values.append(val)
+                    # Only let other threads see the complete list
+                    self._allowed_values = allowed_values
         return self._allowed_values
 
+    @property
+    def _loading_lock(self):
+        """Return a lock guarding the lazy loading of allowed values."""
+        lock = self.__dict__.get("_lock")
+        if lock is None:
+            # setdefault is atomic, so all threads get the same lock
+            lock = self.__dict__.setdefault("_lock", RLock())
+        return lock
+
+    def __getstate__(self):
+        """Leave out the lock when pickling. A new one is made on use."""
+        state = dict(self.__dict__)
+        state.pop("_lock", None)
+        return state
+
+    @property
+    def dialect_index(self):
+        """Return a dict mapping values in our dialect to allowed values.
+
+        Empty if there is no dialect to normalize from.
+        """
+        if self._dialect_index is None:
+            if not (self.dialect and self.datatype and
+                    self.dialect in self.datatype.dialects):
+                self._dialect_index = {}
+            elif self.allowed_values is self.datatype.allowed_values:
+                # Shared by all dimensions using this datatype
+                self._dialect_index = self.datatype.dialect_index(self.dialect)
+            else:
+                self._dialect_index = build_dialect_index(self.allowed_values,
+                                                          self.dialect)
+        return self._dialect_index
+
 
 class ItemList(BaseScraperList):
     """A one dimensional list of items.
@@ -295,12 +1190,31 @@ class Item(BaseScraperObject):
             self.label = label
         self._collection_path = deque([self])  # Will be overwritten when attached to an ItemList
 
+    @property
+    def _loading_lock(self):
+        """Return a lock guarding the lazy loading of this item."""
+        lock = self.__dict__.get("_lock")
+        if lock is None:
+            # setdefault is atomic, so all threads get the same lock
+            lock = self.__dict__.setdefault("_lock", RLock())
+        return lock
+
+    def __getstate__(self):
+        """Leave out the lock when pickling. A new one is made on use."""
+        state = dict(self.__dict__)
+        state.pop("_lock", None)
+        return state
+
     def _move_here(self):
         """Move the cursor to this item."""
         cu = self.scraper.current_item
         # Already here?
         if self is cu:
             return
+        # Nobody will notice how we got here
+        if not self.scraper._has_navigation_hooks():
+            self.scraper.current_item = self
+            return
         # A child?
         if cu.items and self in cu.items:
             self.scraper.move_to(self)
@@ -308,14 +1222,24 @@ class Item(BaseScraperObject):
         # A parent?
         if self is cu.parent:
             self.scraper.move_up()
-        # A sibling?
-        if self.parent and self in self.parent.items:
+            return
+        # A sibling? (Don't ask the parent for its items, as that
+        # would move the cursor there)
+        if self.parent is not None and self.parent is cu.parent:
             self.scraper.move_up()
             self.scraper.move_to(self)
             return
-        # Last resort: Move to top and all the way down again
-        self.scraper.move_to_top()
-        for step in self.path:
+        # Move up to the closest common ancestor, and down from there
+        path = list(self._collection_path)
+        ancestors = {id(x): i for i, x in enumerate(path)}
+        while id(cu) not in ancestors and cu.parent is not None:
+            self.scraper.move_up()
+            cu = self.scraper.current_item
+        if id(cu) not in ancestors:
+            # Last resort: Move to top and all the way down again
+            self.scraper.move_to_top()
+            cu = self.scraper.current_item
+        for step in path[ancestors.get(id(cu), 0) + 1:]:
             self.scraper.move_to(step)
 
     @property
@@ -364,16 +1288,45 @@ class Collection(Item):
             self._move_here()
 
         if self._items is None:
-            self._items = ItemList()
-            self._items.scraper = self.scraper
-            self._items.collection = self
-            for i in self.scraper._fetch_itemslist(self):
-                i.parent = self
-                if i.type == TYPE_DATASET and i.dialect is None:
-                    i.dialect = self.scraper.dialect
-                self._items.append(i)
+            with self._loading_lock:
+                if self._items is None:
+                    items = self._new_itemlist()
+                    for i in self.scraper._fetch_itemslist(self):
+                        self._adopt(items, i)
+                    # Only let other threads see the complete list
+                    self._items = items
+        return self._items
+
+    async def aitems(self):
+        """Return the ItemList of children, fetching it without blocking.
+
+        Async counterpart of `items`. The cursor of the calling thread is
+        not moved.
+        """
+        if self._items is None:
+            items = self._new_itemlist()
+            async for i in self.scraper._afetch_itemslist(self):
+                self._adopt(items, i)
+            with self._loading_lock:
+                # Keep a list someone else loaded in the meantime
+                if self._items is None:
+                    self._items = items
         return self._items
 
+    def _new_itemlist(self):
+        """Return an empty ItemList for the children of this collection."""
+        items = ItemList()
+        items.scraper = self.scraper
+        items.collection = self
+        return items
+
+    def _adopt(self, items, item):
+        """Add an item to an ItemList of children of this collection."""
+        item.parent = self
+        if item.type == TYPE_DATASET and item.dialect is None:
+            item.dialect = self.scraper.dialect
+        items.append(item)
+
     def __getitem__(self, key):
         """Provide bracket notation.
 
@@ -388,22 +1341,63 @@ class Collection(Item):
             raise NoSuchItem("No such item in Collection")
 
     def get(self, key):
-        """Provide alias for bracket notation."""
-        return self[key]
+        """Provide alias for bracket notation.
+
+        The key can also be a path of ids below this collection, either
+        as a list, or as a string separated by slashes:
+
+          >>> collection.get("BE0101/BE0101A/BefolkningNy")
+
+        A string is first looked for as an id, as ids may contain
+        slashes too.
+        """
+        path = _split_path(key)
+        if path is None:
+            return self[key]
+        if isinstance(key, six.string_types):
+            try:
+                return self._child(key)
+            except NoSuchItem:
+                pass
+        item = self
+        for id_ in path:
+            if not isinstance(item, Collection):
+                raise NoSuchItem("No such item: %s" % key)
+            try:
+                item = item._child(id_)
+            except NoSuchItem:
+                raise NoSuchItem("No such item: %s" % key)
+        return item
+
+    def _child(self, id_):
+        """Return a child by id.
+
+        Unlike collection[id_], the cursor is only moved here if the
+        children must be fetched.
+        """
+        children = self._items if self._items is not None else self.items
+        try:
+            return children[id_]
+        except IndexError:
+            raise NoSuchItem("No such item in Collection")
+
+
+def _split_path(key):
+    """Return key as a list of ids, if it may be a path, else None."""
+    if isinstance(key, (list, tuple)):
+        return list(key)
+    if isinstance(key, six.string_types) and "/" in key:
+        return [x for x in key.split("/") if x]
+    return None
 
 
 class Dataset(Item):
     """A dataset. Can be empty."""
 
-    _data = None  # We store one ResultSet for each unique query
     _dimensions = None
     dialect = None
     query = None
 
-    def __init__(self, id_, label=None, blob=None):
-        super(Dataset, self).__init__(id_, label, blob)
-        self._data = {}
-
     @property
     def items(self):
         """A dataset has no children."""
@@ -415,59 +1409,170 @@ class Dataset(Item):
 
         This hash is _not_ a unique representation of the dataset!
         """
-        dump = dumps(self.query, sort_keys=True)
+        return self._query_hash(self.query)
+
+    @staticmethod
+    def _query_hash(query):
+        dump = dumps(query, sort_keys=True)
         if isinstance(dump, str):
             dump = dump.encode('utf-8')
         return md5(dump).hexdigest()
 
-    def fetch_next(self, query=None, **kwargs):
+    @property
+    def _cache_key(self):
+        """Return a key for the current query in the scraper's cache."""
+        return self._key_for(self.query)
+
+    def _key_for(self, query):
+        """Return a key for a query in the scraper's cache."""
+        scraper_class = type(self.scraper)
+        return ("%s.%s" % (scraper_class.__module__, scraper_class.__name__),
+                tuple(x.id for x in self.path),
+                self._query_hash(query))
+
+    def fetch_next(self, query=None, cache=False, **kwargs):
         """Generator to yield data one row at a time.
-        Yields a Result, not the entire ResultSet. The containing ResultSet
-        can be accessed through `Result.resultset`, but be careful not to
-        manipulate the ResultSet until it is populated (when this generator
-        is empty), or you may see unexpected results.
+
+        Yields a normalized Result, not the entire ResultSet. Results are
+        not kept in memory, so this can be used to stream datasets larger
+        than memory. The ResultSet that normalized them can be accessed
+        through `Result.resultset`, but it will be empty.
+
+        With `cache=True` results are also collected into a ResultSet,
+        that is cached for later calls to `fetch()`, once this generator
+        is exhausted. If the query is already cached, results are served
+        from the cache, and nothing is fetched.
         """
+        # Use a local query, as other threads may change self.query
         if query:
             self.query = query
+        else:
+            query = self.query
 
-        hash_ = self._hash
-        if hash_ in self._data:
-            for result in self._data[hash_]:
+        key = self._key_for(query)
+        cached = self.scraper.cache.get(key, dataset=self)
+        if cached is not None:
+            for result in cached:
                 yield result
+            return
 
         if self.scraper.current_item is not self:
             self._move_here()
 
-        self._data[hash_] = ResultSet()
-        self._data[hash_].dialect = self.dialect
-        self._data[hash_].dataset = self
-        for result in self.scraper._fetch_data(self,
-                                               query=self.query,
-                                               **kwargs):
-            self._data[hash_].append(result)
+        rs = self._new_resultset()
+        if cache:
+            add = rs.append
+        else:
+            plan = rs._get_plan()
+
+            def add(result):
+                rs._attach(result, plan)
+        for result in self.scraper._fetch_data(self, query=query, **kwargs):
+            add(result)
             yield result
+        if cache:
+            self.scraper.cache.set(key, rs)
+
+    async def afetch_next(self, query=None, cache=False, **kwargs):
+        """Async generator to yield data one row at a time.
+
+        Async counterpart of `fetch_next()`. The cursor of the calling
+        thread is not moved.
+        """
+        if query:
+            self.query = query
+        else:
+            query = self.query
+
+        key = self._key_for(query)
+        cached = self.scraper.cache.get(key, dataset=self)
+        if cached is not None:
+            for result in cached:
+                yield result
+            return
+
+        await self.adimensions()
+        rs = self._new_resultset()
+        if cache:
+            add = rs.append
+        else:
+            plan = rs._get_plan()
+
+            def add(result):
+                rs._attach(result, plan)
+        async for result in self.scraper._afetch_data(self, query=query,
+                                                      **kwargs):
+            add(result)
+            yield result
+        if cache:
+            self.scraper.cache.set(key, rs)
+
+    async def afetch(self, query=None, **kwargs):
+        """Fetch data for this dataset, without blocking.
+
+        Async counterpart of `fetch()`, sharing its cache. Datasets can
+        be fetched at the same time from one event loop:
+
+          >>> results = await asyncio.gather(*[d.afetch() for d in datasets])
+        """
+        if query:
+            self.query = query
+        else:
+            query = self.query
+
+        key = self._key_for(query)
+        cached = self.scraper.cache.get(key, dataset=self)
+        if cached is not None:
+            return cached
+
+        await self.adimensions()
+        rs = self._new_resultset()
+        rows = []
+        async for result in self.scraper._afetch_data(self, query=query,
+                                                      **kwargs):
+            rows.append(result)
+        rs.extend(rows)
+        self.scraper.cache.set(key, rs)
+        return rs
 
     def fetch(self, query=None, **kwargs):
         """Ask scraper to return data for the current dataset."""
+        # Use a local query, as other threads may change self.query
         if query:
             self.query = query
+        else:
+            query = self.query
 
-        hash_ = self._hash
-        if hash_ in self._data:
-            return self._data[hash_]
+        key = self._key_for(query)
+        cached = self.scraper.cache.get(key, dataset=self)
+        if cached is not None:
+            return cached
 
         if self.scraper.current_item is not self:
             self._move_here()
 
-        rs = ResultSet()
+        rs = self._new_resultset()
+        rs.extend(self.scraper._fetch_data(self, query=query, **kwargs))
+        self.scraper.cache.set(key, rs)
+        return rs
+
+    def _compile_plan(self, normalize=True):
+        """Return an IngestionPlan for appending results to this dataset."""
+        # Dimensions loaded by adimensions() don't need the cursor moved
+        dimensions = self._dimensions
+        if dimensions is None:
+            dimensions = self.dimensions
+        return IngestionPlan(dimensions, normalize=normalize)
+
+    def _new_resultset(self):
+        """Return an empty ResultSet, of the kind the scraper asks for."""
+        if self.scraper.columnar:
+            rs = ColumnarResultSet()
+        else:
+            rs = ResultSet()
         rs.dialect = self.dialect
         rs.dataset = self
-        for result in self.scraper._fetch_data(self,
-                                               query=self.query,
-                                               **kwargs):
-            rs.append(result)
-        self._data[hash_] = rs
-        return self._data[hash_]
+        return rs
 
     @property
     def data(self):
@@ -482,11 +1587,31 @@ class Dataset(Item):
             self._move_here()
 
         if self._dimensions is None:
-            self._dimensions = DimensionList()
-            for d in self.scraper._fetch_dimensions(self):
+            with self._loading_lock:
+                if self._dimensions is None:
+                    dimensions = DimensionList()
+                    for d in self.scraper._fetch_dimensions(self):
+                        d.dataset = self
+                        d.scraper = self.scraper
+                        dimensions.append(d)
+                    self._dimensions = dimensions
+        return self._dimensions
+
+    async def adimensions(self):
+        """Return available dimensions, fetching them without blocking.
+
+        Async counterpart of `dimensions`. The cursor of the calling
+        thread is not moved.
+        """
+        if self._dimensions is None:
+            dimensions = DimensionList()
+            async for d in self.scraper._afetch_dimensions(self):
                 d.dataset = self
                 d.scraper = self.scraper
-                self._dimensions.append(d)
+                dimensions.append(d)
+            with self._loading_lock:
+                if self._dimensions is None:
+                    self._dimensions = dimensions
         return self._dimensions
 
     @property
@@ -501,40 +1626,173 @@ class BaseScraper(Collection):
     """The base class for scrapers."""
 
     # Hooks
-    _hooks = {
-        'init': [],  # Called when initiating the class
-        'up': [],  # Called when trying to go up one level
-        'top': [],  # Called when moving to top level
-        'select': [],  # Called when trying to move to a Collection or Dataset
-    }
+    HOOKS = (
+        'init',  # Called when initiating the class
+        'up',  # Called when trying to go up one level
+        'top',  # Called when moving to top level
+        'select',  # Called when trying to move to a Collection or Dataset
+    )
 
     dialect = None
+    columnar = False  # Store results in a ColumnarResultSet
+    http_cache = None  # Cache GET responses, e.g. in a SQLiteHTTPCache
+    rate_limits = None  # RateLimiters by host, e.g. {"a.se": RateLimiter(10)}
 
     @classmethod
     def on(cls, hook):
-        """Hook decorator."""
+        """Hook decorator.
+
+        The method will be called on `hook` for scrapers of the class it
+        is defined in, and its subclasses.
+        """
+        if hook not in cls.HOOKS:
+            raise ValueError("No such hook: %s" % hook)
+
         def decorator(function_):
-            cls._hooks[hook].append(function_)
+            function_._scraper_hooks = getattr(function_, "_scraper_hooks",
+                                               ()) + (hook,)
             return function_
         return decorator
 
+    @classmethod
+    def _has_navigation_hooks(cls):
+        """Check if this scraper needs to be told where the cursor goes."""
+        return any(cls._get_hooks(hook) for hook in ("up", "top", "select"))
+
+    @classmethod
+    def _get_hooks(cls, hook):
+        """Return the functions to call on a hook, for this class.
+
+        Hooks are collected from the class and its bases (base classes
+        first), once per class. A hook method overridden by a subclass
+        is only called once, in its subclass version, even if the
+        override is not decorated itself.
+        """
+        if "_hook_cache" not in cls.__dict__:
+            cls._hook_cache = {}
+        try:
+            return cls._hook_cache[hook]
+        except KeyError:
+            pass
+        names = OrderedDict()
+        for klass in reversed(cls.__mro__):
+            for name, attr in list(klass.__dict__.items()):
+                if hook in getattr(attr, "_scraper_hooks", ()):
+                    names[name] = True
+        # Call whatever the name resolves to in this class. Subclasses
+        # can turn a hook off by setting its name to None.
+        hooks = [getattr(cls, name) for name in names]
+        hooks = cls._hook_cache[hook] = [f for f in hooks if callable(f)]
+        return hooks
+
     def __repr__(self):
         return u'<Scraper: %s>' % self.__class__.__name__
 
     def __init__(self, *args, **kwargs):
         """Initiate with a ROOT collection on top."""
-        self.current_item = Collection(ROOT)
-        self.current_item.scraper = self
-        self.root = self.current_item
+        # Fetched results, shared by all datasets
+        self.cache = ResultCache()
+        # Every thread has a cursor of its own, starting at root
+        self._local = local()
+        self.root = Collection(ROOT)
+        self.root.scraper = self
+        self.current_item = self.root
 
-        for f in self._hooks["init"]:
+        for f in self._get_hooks("init"):
             f(self, *args, **kwargs)
 
+    def __getstate__(self):
+        """Leave out cursors and the transport when pickling.
+
+        The scraper is unpickled with the cursor at root, and a new
+        transport.
+        """
+        state = super(BaseScraper, self).__getstate__()
+        state.pop("_local", None)
+        state.pop("transport", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = local()
+
     def __getitem__(self, key):
         """ Make scraper[a] shorthand for scraper.items[a]
         """
         return self.items[key]
 
+    def get(self, key):
+        """Get an item by id at the current position, or by a path of ids
+        from the top.
+
+        `scraper.get("BE/BE0101/BE0101A/BefolkningNy")` and
+        `scraper.get(["BE", "BE0101", "BE0101A", "BefolkningNy"])` are
+        the same. Items along the path are only fetched once, and the
+        cursor is only moved to collections whose items must be fetched.
+        A string with slashes is first looked for as an id at the
+        current position, as ids may contain slashes too.
+        """
+        path = _split_path(key)
+        if path is None:
+            return self[key]
+        current = self.current_item
+        if isinstance(key, six.string_types) and \
+           isinstance(current, Collection):
+            try:
+                return current._child(key)
+            except NoSuchItem:
+                pass
+        return self.root.get(path)
+
+    @property
+    def transport(self):
+        """The Transport to make all HTTP requests through.
+
+        Created on first use, and shared by all threads. GET responses
+        are cached in `http_cache`, if set, apart from those of other
+        scraper classes, and requests are kept within `rate_limits`.
+        """
+        try:
+            return self.__dict__["transport"]
+        except KeyError:
+            transport = Transport(cache=self.http_cache,
+                                  namespace=self._http_namespace,
+                                  rate_limits=self.rate_limits)
+            return self.__dict__.setdefault("transport", transport)
+
+    @transport.setter
+    def transport(self, transport):
+        """Use a transport of our own.
+
+        The `http_cache` and `rate_limits` of the scraper class are
+        added, unless the transport has a cache, or a rate limit for
+        the same host, of its own.
+        """
+        if transport.cache is None and self.http_cache is not None:
+            transport.cache = self.http_cache
+            transport.namespace = transport.namespace or self._http_namespace
+        for host, limiter in (self.rate_limits or {}).items():
+            transport.rate_limits.setdefault(host, limiter)
+        self.__dict__["transport"] = transport
+
+    @property
+    def _http_namespace(self):
+        """Keeps cached responses apart from those of other classes."""
+        scraper_class = type(self)
+        return "%s.%s" % (scraper_class.__module__, scraper_class.__name__)
+
+    @property
+    def current_item(self):
+        """The item at the cursor position, of this thread."""
+        try:
+            return self._local.current_item
+        except AttributeError:
+            return self.root
+
+    @current_item.setter
+    def current_item(self, item):
+        self._local.current_item = item
+
     @property
     def items(self):
         """ItemList of collections or datasets at the current position.
@@ -547,6 +1805,10 @@ class BaseScraper(Collection):
         """Let the current item fetch it's data."""
         return self.current_item.fetch(query, **kwargs)
 
+    async def aitems(self):
+        """ItemList at the current position, fetched without blocking."""
+        return await self.current_item.aitems()
+
     @property
     def parent(self):
         """Return the item above the current, if any."""
@@ -560,7 +1822,7 @@ class BaseScraper(Collection):
     def move_to_top(self):
         """Move to root item."""
         self.current_item = self.root
-        for f in self._hooks["top"]:
+        for f in self._get_hooks("top"):
             f(self)
         return self
 
@@ -569,10 +1831,10 @@ class BaseScraper(Collection):
         if self.current_item.parent is not None:
             self.current_item = self.current_item.parent
 
-        for f in self._hooks["up"]:
+        for f in self._get_hooks("up"):
             f(self)
         if self.current_item is self.root:
-            for f in self._hooks["top"]:
+            for f in self._get_hooks("top"):
                 f(self)
         return self
 
@@ -583,7 +1845,7 @@ class BaseScraper(Collection):
                 self.current_item = self.items[id_]
             except (StopIteration, IndexError, NoSuchItem):
                 raise NoSuchItem
-            for f in self._hooks["select"]:
+            for f in self._get_hooks("select"):
                 f(self, id_)
         return self
 
@@ -622,13 +1884,137 @@ class BaseScraper(Collection):
         """Must be overriden by scraper authors, to yield dataset rows."""
         raise Exception("This scraper has no method for fetching data!")
 
+    async def _afetch_itemslist(self, item):
+        """Can be overriden by scraper authors, to yield items without blocking.
+
+        By default, _fetch_itemslist is run in worker threads.
+        """
+        async for x in self._aiterate(item, self._fetch_itemslist, item):
+            yield x
+
+    async def _afetch_dimensions(self, dataset):
+        """Can be overriden by scraper authors, to yield dimensions without
+        blocking.
+
+        By default, _fetch_dimensions is run in worker threads.
+        """
+        async for x in self._aiterate(dataset, self._fetch_dimensions,
+                                      dataset):
+            yield x
+
+    async def _afetch_data(self, dataset, query=None, **kwargs):
+        """Can be overriden by scraper authors, to yield dataset rows without
+        blocking, e.g. by making many requests at the same time:
+
+        responses = await asyncio.gather(*[self.transport.aget(url)
+                                           for url in urls])
+
+        By default, _fetch_data is run in worker threads.
+        """
+        async for x in self._aiterate(dataset, self._fetch_data, dataset,
+                                      query=query, **kwargs):
+            yield x
+
+    async def _aiterate(self, item, function, *args, **kwargs):
+        """Yield from a blocking method, run in worker threads.
+
+        Values are pulled 1000 at a time, with the cursor of the worker
+        thread at `item`, as the sync methods expect. As with threads,
+        scrapers with navigation hooks should not fetch several items at
+        the same time.
+        """
+        size = 1000
+        iterators = []
+
+        def pull():
+            if self.current_item is not item:
+                item._move_here()
+            if not iterators:
+                iterators.append(iter(function(*args, **kwargs)))
+            return list(islice(iterators[0], size))
+
+        while True:
+            chunk = await self.transport.arun(pull)
+            for x in chunk:
+                yield x
+            if len(chunk) < size:
+                return
+
+    def save_catalog(self, path, dimensions=False):
+        """Save all items fetched so far to a file.
+
+        See `statscraper.catalog.save`.
+        """
+        from . import catalog
+        catalog.save(self, path, dimensions=dimensions)
+
+    def load_catalog(self, path):
+        """Load items from a file made by save_catalog(), without fetching.
+
+        See `statscraper.catalog.load`.
+        """
+        from . import catalog
+        catalog.load(self, path)
+
+    def refresh_catalog(self, depth=1):
+        """Fetch items again, keeping those that did not change.
+
+        See `statscraper.catalog.refresh`.
+        """
+        from . import catalog
+        return catalog.refresh(self, depth=depth)
+
+    def crawl(self, max_workers=8, max_depth=None, include=None):
+        """Yield every dataset in the tree, fetching collections in parallel.
+
+        The tree is walked breadth first, and the items of up to
+        `max_workers` collections are fetched at the same time. Datasets
+        are yielded as soon as they are found, so the order may vary.
+        Once exhausted, the whole tree is loaded (e.g. for
+        `save_catalog`). The cursor of the calling thread is left as is.
+
+        max_depth: Don't look for items deeper than this, 1 being the
+                   items at the top.
+        include: A function taking an item, returning False for
+                 collections and datasets that should be skipped.
+
+        Scrapers with navigation hooks are crawled one collection at
+        a time, as their hooks may depend on each other.
+        """
+        if self._has_navigation_hooks():
+            max_workers = 1
+
+        def fetch(collection):
+            # Moves the cursor of the worker thread only
+            return list(collection.items)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {executor.submit(fetch, self.root): 1}
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        depth = pending.pop(future)
+                        for item in future.result():
+                            if include is not None and not include(item):
+                                continue
+                            if item.type == TYPE_DATASET:
+                                yield item
+                            elif max_depth is None or depth < max_depth:
+                                pending[executor.submit(fetch, item)] = \
+                                    depth + 1
+            finally:
+                # Stopped early: Don't fetch anything more
+                for future in pending:
+                    future.cancel()
+
     @property
     def descendants(self):
         """Recursively return every dataset below current item."""
         for i in self.current_item.items:
             self.move_to(i)
             if i.type == TYPE_COLLECTION:
-                for c in self.children:
+                for c in self.descendants:
                     yield c
             else:
                 yield i
@@ -0,0 +1,440 @@
+"""Caches for fetched results.
+
+A scraper keeps every ResultSet it fetches in a cache, shared by all of
+its datasets, so that asking for the same data twice only fetches it
+once. The default ResultCache is kept in memory, and can be given a
+budget in bytes, an eviction policy, and a time to live:
+
+    scraper.cache = ResultCache(max_bytes=512 * 1024 ** 2, ttl=3600)
+
+SQLiteResultCache stores results on disk, so that they survive a
+restart of the process:
+
+    scraper.cache = SQLiteResultCache("results.sqlite", ttl=24 * 3600)
+
+Any object with the same get/set/invalidate/clear methods can be used
+as a cache.
+
+HTTP responses can be cached too, one level below, by the transport of
+a scraper. SQLiteHTTPCache and FileHTTPCache keep responses by scraper
+and URL, and expired responses are revalidated with conditional
+requests (If-None-Match/If-Modified-Since) before they are downloaded
+again. See `statscraper.transport`.
+"""
+from collections import OrderedDict
+from hashlib import md5
+from json import dumps
+from threading import RLock, get_ident
+from time import time
+import os
+import pickle
+import sqlite3
+
+LRU = "lru"  # Evict the least recently used entry first
+LFU = "lfu"  # Evict the least frequently used entry first
+
+
+class ResultCache(object):
+    """An in-memory cache of ResultSets, by key.
+
+    Keys are (scraper class, dataset path, query hash) tuples, see
+    `Dataset._cache_key`.
+    """
+
+    def __init__(self, max_bytes=None, policy=LRU, ttl=None):
+        """Create an empty cache.
+
+        max_bytes: Approximate memory budget. None means no limit.
+        policy: LRU or LFU
+        ttl: Default number of seconds before an entry expires, or None
+        """
+        if policy not in (LRU, LFU):
+            raise ValueError("Unknown eviction policy: %s" % policy)
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.ttl = ttl
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> [resultset, size, expires, uses], least recently used first
+        self._entries = OrderedDict()
+        self._lock = RLock()
+
+    def get(self, key, dataset=None):
+        """Return a cached ResultSet, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None \
+               and entry[2] < time():
+                # Expired
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry[3] += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, resultset, ttl=None):
+        """Store a ResultSet, evicting other entries if needed.
+
+        ResultSets larger than the whole budget are not stored.
+        """
+        size = resultset.nbytes
+        if ttl is None:
+            ttl = self.ttl
+        expires = None if ttl is None else time() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = [resultset, size, expires, 0]
+            self.bytes += size
+            self._evict(keep=key)
+
+    def invalidate(self, key):
+        """Remove an entry, if cached."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and \
+                (entry[2] is None or entry[2] >= time())
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        """Return a dict with cache hits, misses, size, etc."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry[1]
+
+    def _evict(self, keep):
+        """Evict entries, other than `keep`, until we are within budget."""
+        if self.max_bytes is None:
+            return
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            now = time()
+            candidates = [k for k in self._entries if k != keep]
+            expired = [k for k in candidates
+                       if self._entries[k][2] is not None and
+                       self._entries[k][2] < now]
+            if expired:
+                key = expired[0]
+            elif self.policy == LFU:
+                # Least used, and least recently used among those
+                key = min(candidates, key=lambda k: self._entries[k][3])
+            else:
+                key = candidates[0]
+            self._remove(key)
+            self.evictions += 1
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = RLock()
+
+    def __repr__(self):
+        return "<ResultCache: %d entries, %d bytes>" % (len(self), self.bytes)
+
+
+class SQLiteResultCache(object):
+    """A persistent cache, storing normalized results in an SQLite file.
+
+    Entries are keyed by scraper class, dataset path and query hash, so
+    that any scraper instance, in any process, can reuse them.
+    """
+
+    def __init__(self, path, ttl=None):
+        """Open (or create) a cache file.
+
+        ttl: Default number of seconds before an entry expires, or None
+        """
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute("""CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                created REAL,
+                expires REAL,
+                data BLOB
+            )""")
+
+    @staticmethod
+    def _key(key):
+        """Return a canonical string for a cache key."""
+        return dumps(key, sort_keys=True)
+
+    def get(self, key, dataset=None):
+        """Return a cached ResultSet, or None.
+
+        If a dataset is given, results are connected to its dimensions.
+        """
+        from .base_scraper import ResultSet
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT expires, data FROM results WHERE key = ?",
+                (self._key(key),)).fetchone()
+            if row is not None and row[0] is not None and row[0] < time():
+                # Expired
+                self.invalidate(key)
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return ResultSet._from_records(pickle.loads(row[1]), dataset=dataset)
+
+    def set(self, key, resultset, ttl=None):
+        """Store a ResultSet."""
+        if ttl is None:
+            ttl = self.ttl
+        now = time()
+        expires = None if ttl is None else now + ttl
+        data = pickle.dumps(resultset._to_records(), pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (self._key(key), now, expires, sqlite3.Binary(data)))
+
+    def invalidate(self, key):
+        """Remove an entry, if cached."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM results WHERE key = ?",
+                             (self._key(key),))
+
+    def purge(self):
+        """Remove all expired entries."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM results WHERE expires < ?",
+                             (time(),))
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM results")
+
+    def close(self):
+        self._db.close()
+
+    def __contains__(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT expires FROM results WHERE key = ?",
+                (self._key(key),)).fetchone()
+        return row is not None and (row[0] is None or row[0] >= time())
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @property
+    def stats(self):
+        """Return a dict with cache hits, misses and number of entries."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self),
+        }
+
+    def __getstate__(self):
+        """Pickle the path only. The file is opened again on unpickling."""
+        state = dict(self.__dict__)
+        del state["_lock"], state["_db"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = RLock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+
+    def __repr__(self):
+        return "<SQLiteResultCache: %s>" % self.path
+
+
+class SQLiteHTTPCache(object):
+    """A persistent cache of HTTP responses, in an SQLite file.
+
+    Responses are kept by namespace (one per scraper class) and URL.
+    Expired responses are kept too, so that they can be revalidated.
+    """
+
+    def __init__(self, path, ttl=None):
+        """Open (or create) a cache file.
+
+        ttl: Number of seconds a response is used without asking the
+             server if it changed. None means forever, 0 means always ask.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                namespace TEXT,
+                url TEXT,
+                expires REAL,
+                data BLOB,
+                PRIMARY KEY (namespace, url)
+            )""")
+
+    def get(self, namespace, url):
+        """Return a cached response, as a dict, even if expired, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT expires, data FROM responses "
+                "WHERE namespace = ? AND url = ?", (namespace, url)).fetchone()
+        if row is None:
+            return None
+        entry = pickle.loads(row[1])
+        entry["expires"] = row[0]
+        return entry
+
+    def set(self, namespace, url, entry, ttl=None):
+        """Store a response dict, made fresh for `ttl` seconds."""
+        if ttl is None:
+            ttl = self.ttl
+        expires = None if ttl is None else time() + ttl
+        data = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (namespace, url, expires, sqlite3.Binary(data)))
+
+    def invalidate(self, namespace, url):
+        """Remove a response, if cached."""
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM responses WHERE namespace = ? AND url = ?",
+                (namespace, url))
+
+    def clear(self, namespace=None):
+        """Remove all responses, or all responses in a namespace."""
+        with self._lock, self._db:
+            if namespace is None:
+                self._db.execute("DELETE FROM responses")
+            else:
+                self._db.execute("DELETE FROM responses WHERE namespace = ?",
+                                 (namespace,))
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __repr__(self):
+        return "<SQLiteHTTPCache: %s>" % self.path
+
+
+class FileHTTPCache(object):
+    """A persistent cache of HTTP responses, one file per response.
+
+    Files are kept in a directory per namespace (one per scraper class),
+    below `path`. The directories are created when first written to.
+    """
+
+    def __init__(self, path, ttl=None):
+        """Use (or create) a cache directory.
+
+        ttl: Number of seconds a response is used without asking the
+             server if it changed. None means forever, 0 means always ask.
+        """
+        self.path = path
+        self.ttl = ttl
+
+    def _file(self, namespace, url):
+        name = md5(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, namespace, name)
+
+    def get(self, namespace, url):
+        """Return a cached response, as a dict, even if expired, or None."""
+        try:
+            with open(self._file(namespace, url), "rb") as f:
+                expires, entry = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+        entry["expires"] = expires
+        return entry
+
+    def set(self, namespace, url, entry, ttl=None):
+        """Store a response dict, made fresh for `ttl` seconds."""
+        if ttl is None:
+            ttl = self.ttl
+        expires = None if ttl is None else time() + ttl
+        path = self._file(namespace, url)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+        # Write to a file of our own, so that readers never see half of it
+        tmp = "%s.%s.%s" % (path, os.getpid(), get_ident())
+        with open(tmp, "wb") as f:
+            pickle.dump((expires, entry), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def invalidate(self, namespace, url):
+        """Remove a response, if cached."""
+        try:
+            os.remove(self._file(namespace, url))
+        except OSError:
+            pass
+
+    def clear(self, namespace=None):
+        """Remove all responses, or all responses in a namespace."""
+        if namespace is None:
+            namespaces = os.listdir(self.path) \
+                if os.path.isdir(self.path) else []
+        else:
+            namespaces = [namespace]
+        for namespace in namespaces:
+            directory = os.path.join(self.path, namespace)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+
+    def __len__(self):
+        if not os.path.isdir(self.path):
+            return 0
+        return sum(len(os.listdir(os.path.join(self.path, x)))
+                   for x in os.listdir(self.path))
+
+    def __repr__(self):
+        return "<FileHTTPCache: %s>" % self.path
@@ -0,0 +1,200 @@
+"""Catalog snapshots: The item tree of a scraper, saved to a file.
+
+Walking the whole tree of a large site means one request per collection.
+Once fetched, the tree (collections, datasets, and, optionally,
+dimensions and their allowed values) can be saved, and loaded by
+another scraper without fetching anything:
+
+    scraper.save_catalog("scb.catalog", dimensions=True)
+
+    scraper = SCB()
+    scraper.load_catalog("scb.catalog")
+
+Only items that have already been fetched are saved. refresh() fetches
+the items of the top levels again, and only throws away the subtrees
+of items that changed.
+"""
+from time import time
+import gzip
+import pickle
+
+from .base_scraper import Collection, Dataset, DimensionList
+from .ValueList import ValueList
+
+CATALOG_VERSION = 1
+
+# Attributes that are set up when items are attached to a scraper, or
+# loaded lazily, and are not part of the catalog
+ITEM_ATTRS = ("parent", "scraper", "_items", "_dimensions",
+              "_collection_path", "_lock", "query")
+DIMENSION_ATTRS = ("dataset", "scraper", "_allowed_values", "_dialect_index",
+                   "_lock")
+VALUE_ATTRS = ("_dimension",)
+
+
+def save(scraper, path, dimensions=False):
+    """Save the items fetched so far by a scraper to a file.
+
+    With dimensions=True, dimensions already fetched are saved too,
+    along with any allowed values they did not get from a datatype.
+    """
+    snapshot = {
+        "version": CATALOG_VERSION,
+        "scraper": _class_name(type(scraper)),
+        "created": time(),
+        "items": _dump_children(scraper.root, dimensions),
+    }
+    with gzip.open(path, "wb") as file_:
+        pickle.dump(snapshot, file_, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load(scraper, path):
+    """Give a scraper the items of a saved catalog.
+
+    Nothing is fetched. Items missing from the catalog are fetched as
+    usual, when needed.
+    """
+    with gzip.open(path, "rb") as file_:
+        snapshot = pickle.load(file_)
+    if snapshot.get("version") != CATALOG_VERSION:
+        raise ValueError("Unsupported catalog version: %s" %
+                         snapshot.get("version"))
+    if snapshot["scraper"] != _class_name(type(scraper)):
+        raise ValueError("This catalog was made by %s" % snapshot["scraper"])
+    _load_children(scraper.root, snapshot["items"])
+
+
+def refresh(scraper, depth=1):
+    """Fetch the items of the top `depth` levels again.
+
+    Items that are unchanged (same class, id, label, blob etc) are kept,
+    along with everything loaded below them. Items that changed are
+    replaced, and their children and dimensions will be fetched when
+    needed. Returns a list of new and changed items.
+    """
+    changed = []
+    _refresh(scraper.root, depth, changed)
+    return changed
+
+
+def _class_name(cls):
+    return "%s.%s" % (cls.__module__, cls.__name__)
+
+
+def _state(obj, skip):
+    return {k: v for k, v in obj.__dict__.items() if k not in skip}
+
+
+def _slots(obj, skip):
+    """Return the slots of an object, for classes that use them."""
+    slots = {}
+    for klass in type(obj).__mro__:
+        for slot in klass.__dict__.get("__slots__", ()):
+            if slot not in skip and hasattr(obj, slot):
+                slots[slot] = getattr(obj, slot)
+    return slots
+
+
+def _dump_children(collection, dimensions):
+    """Return the loaded children of a collection, or None."""
+    if collection._items is None:
+        return None
+    nodes = []
+    for item in collection._items:
+        node = {"class": type(item), "state": _state(item, ITEM_ATTRS)}
+        if isinstance(item, Collection):
+            node["items"] = _dump_children(item, dimensions)
+        elif dimensions and item._dimensions is not None:
+            node["dimensions"] = [_dump_dimension(d)
+                                  for d in item._dimensions]
+        nodes.append(node)
+    return nodes
+
+
+def _dump_dimension(dimension):
+    node = {"class": type(dimension),
+            "state": _state(dimension, DIMENSION_ATTRS)}
+    allowed_values = dimension._allowed_values
+    if allowed_values is not None and dimension.datatype is None:
+        node["allowed_values"] = [_dump_value(x) for x in allowed_values]
+    return node
+
+
+def _dump_value(dimensionvalue):
+    """Dimension values are saved with their class, as items are."""
+    node = {"class": type(dimensionvalue),
+            "slots": _slots(dimensionvalue, VALUE_ATTRS)}
+    if hasattr(dimensionvalue, "__dict__"):
+        node["state"] = _state(dimensionvalue, VALUE_ATTRS)
+    return node
+
+
+def _restore(node):
+    cls = node["class"]
+    obj = cls.__new__(cls)
+    for slot, value in node.get("slots", {}).items():
+        object.__setattr__(obj, slot, value)
+    if "state" in node:
+        obj.__dict__.update(node["state"])
+    return obj
+
+
+def _load_children(collection, nodes):
+    if nodes is None:
+        return
+    items = collection._new_itemlist()
+    for node in nodes:
+        item = _restore(node)
+        collection._adopt(items, item)
+        if isinstance(item, Collection):
+            _load_children(item, node.get("items"))
+        elif node.get("dimensions") is not None:
+            _load_dimensions(item, node["dimensions"])
+    collection._items = items
+
+
+def _load_dimensions(dataset, nodes):
+    dimensions = DimensionList()
+    for node in nodes:
+        dimension = _restore(node)
+        dimension.dataset = dataset
+        dimension.scraper = dataset.scraper
+        dimension._dialect_index = None
+        dimension._allowed_values = None
+        if "allowed_values" in node:
+            dimension._allowed_values = ValueList(
+                _load_value(x, dimension) for x in node["allowed_values"])
+        dimensions.append(dimension)
+    dataset._dimensions = dimensions
+
+
+def _load_value(node, dimension):
+    dimensionvalue = _restore(node)
+    object.__setattr__(dimensionvalue, "_dimension", dimension)
+    return dimensionvalue
+
+
+def _refresh(collection, depth, changed):
+    if depth < 1 or collection._items is None:
+        return
+    scraper = collection.scraper
+    with collection._loading_lock:
+        collection._move_here()
+        old_items = {(type(x), x.id): x for x in collection._items}
+        items = collection._new_itemlist()
+        unchanged = []
+        for item in scraper._fetch_itemslist(collection):
+            if isinstance(item, Dataset) and item.dialect is None:
+                item.dialect = scraper.dialect
+            old = old_items.get((type(item), item.id))
+            if old is not None and \
+               _state(old, ITEM_ATTRS) == _state(item, ITEM_ATTRS):
+                item = old
+                unchanged.append(item)
+            else:
+                changed.append(item)
+            collection._adopt(items, item)
+        collection._items = items
+    for item in unchanged:
+        if isinstance(item, Collection):
+            _refresh(item, depth - 1, changed)
@@ -1,84 +1,477 @@
-"""Contains code for parsing datatypes from the statscraper-datatypes repo."""
+"""Contains code for parsing datatypes from the statscraper-datatypes repo.
+
+Datatypes are shared by the whole process: `Datatype("region")` will
+always return the same object, and the list of datatypes is only read
+once. The allowed values of a datatype are loaded when first used.
+
+To speed up start up, all csv files can be compiled into a single
+bundle file, that is read in one go:
+
+    python -c "from statscraper.datatypes import build_bundle; build_bundle()"
+
+The bundle is ignored, and the csv files used, if any csv file has
+changed since the bundle was built.
+"""
 from glob import iglob
 from itertools import chain
 from csv import DictReader
 from csv import reader as CsvReader
-from .exceptions import NoSuchDatatype
+from hashlib import sha1
+from threading import RLock
+from collections import OrderedDict
+from .compat import unicode
+from .exceptions import NoSuchDatatype, NoSuchItem
 from .DimensionValue import DimensionValue
 from .ValueList import ValueList
+import marshal
 import os
 
 DIR_PATH = os.path.dirname(os.path.realpath(__file__))
-DATATYPES_FILE = os.path.join(DIR_PATH, "datatypes", "datatypes.csv")
+DATATYPES_DIR = os.path.join(DIR_PATH, "datatypes")
+DATATYPES_FILE = os.path.join(DATATYPES_DIR, "datatypes.csv")
+VALUES_DIR = os.path.join(DATATYPES_DIR, "values")
 VALUE_DELIMITOR = ','
 
+BUNDLE_ENVVAR = "STATSCRAPER_DATATYPES_BUNDLE"
+BUNDLE_FILE = os.getenv(BUNDLE_ENVVAR,
+                        os.path.join(DATATYPES_DIR, "datatypes.bundle"))
+BUNDLE_VERSION = 1
+
+_lock = RLock()  # Guards the registry and lazy loading of values
+_registry = {}  # Datatype objects, by id
+_definitions = None  # Rows from datatypes.csv, by id
+_bundle = None  # Contents of the bundle file, False if missing or stale
+_inverted_index = None  # All values in all dialects, see get_inverted_index
+_NOTHING = object()  # Marks arguments that were not given
+
+
+def _get_definitions():
+    """Return all rows of datatypes.csv, by id, parsing the file once."""
+    global _definitions
+    if _definitions is None:
+        with _lock:
+            if _definitions is None:
+                bundle = _get_bundle()
+                if bundle:
+                    _definitions = bundle["definitions"]
+                else:
+                    _definitions = _parse_definitions()
+    return _definitions
+
+
+def _parse_definitions():
+    with open(DATATYPES_FILE, 'r') as csvfile:
+        return {row["id"]: row for row in DictReader(csvfile)}
+
+
+def _parse_values_file(file_):
+    """Return the dialects of a csv file, and all its values.
+
+    Values are returned as (id, label, {dialect: [alias, ...]}) tuples.
+    """
+    with open(file_, 'r') as csvfile:
+        reader = DictReader(csvfile)
+        dialect_names = [x
+                         for x in reader.fieldnames
+                         if x.startswith("dialect:")]
+        values = []
+        for row in reader:
+            dialects = {}
+            for d in dialect_names:
+                # parse this cell as a csv row
+                csvreader = CsvReader([row[d]],
+                                      delimiter=VALUE_DELIMITOR,
+                                      skipinitialspace=True,
+                                      strict=True)
+                dialects[d[8:]] = next(csvreader)
+            values.append((row["id"], row["label"], dialects))
+    return [d[8:] for d in dialect_names], values
+
+
+def _get_bundle():
+    """Return the contents of the bundle file, if it is up to date."""
+    global _bundle
+    if _bundle is None:
+        with _lock:
+            if _bundle is None:
+                _bundle = _read_bundle(BUNDLE_FILE) or False
+    return _bundle
+
+
+def _read_bundle(path):
+    try:
+        with open(path, 'rb') as file_:
+            bundle = marshal.loads(file_.read())
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(bundle, dict) or \
+       bundle.get("version") != BUNDLE_VERSION:
+        return None
+    if not _is_fresh(bundle["manifest"]):
+        return None
+    return bundle
+
+
+def _relpath(path):
+    return os.path.relpath(path, DATATYPES_DIR).replace(os.sep, "/")
+
+
+def _abspath(relpath):
+    return os.path.join(DATATYPES_DIR, *relpath.split("/"))
+
+
+def _file_hash(path):
+    with open(path, 'rb') as file_:
+        return sha1(file_.read()).hexdigest()
+
+
+def _is_fresh(manifest):
+    """Check that no files have changed, since the manifest was made.
+
+    Files with a different modification time (e.g. after a fresh
+    checkout) are compared by content.
+    """
+    try:
+        for relpath, entries in manifest["dirs"].items():
+            if sorted(os.listdir(_abspath(relpath))) != entries:
+                return False
+        for relpath, (mtime, size, hash_) in manifest["files"].items():
+            path = _abspath(relpath)
+            stat = os.stat(path)
+            if stat.st_size != size:
+                return False
+            if stat.st_mtime_ns != mtime and _file_hash(path) != hash_:
+                return False
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def build_bundle(path=None):
+    """Compile datatypes.csv and all value files into a bundle file.
+
+    Returns the path of the bundle.
+    """
+    path = path or BUNDLE_FILE
+    manifest = {"dirs": {}, "files": {}}
+    for root, dirs, files in os.walk(DATATYPES_DIR):
+        manifest["dirs"][_relpath(root)] = sorted(dirs + files)
+    csv_files = [DATATYPES_FILE]
+    for root, dirs, files in os.walk(VALUES_DIR):
+        csv_files += [os.path.join(root, f) for f in files
+                      if f.endswith(".csv")]
+    for file_ in csv_files:
+        stat = os.stat(file_)
+        manifest["files"][_relpath(file_)] = (stat.st_mtime_ns,
+                                              stat.st_size,
+                                              _file_hash(file_))
+    # The bundle file itself will be added to the datatypes dir
+    bundle_dir = _relpath(os.path.dirname(os.path.abspath(path)))
+    if bundle_dir in manifest["dirs"]:
+        entries = manifest["dirs"][bundle_dir]
+        name = os.path.basename(path)
+        if name not in entries:
+            manifest["dirs"][bundle_dir] = sorted(entries + [name])
+
+    definitions = _parse_definitions()
+    domains = {}
+    for row in definitions.values():
+        domain = row["allowed_values"]
+        if domain and domain not in domains:
+            domains[domain] = [_relpath(f) for f in _get_csv_files(domain)]
+    values = {_relpath(f): _parse_values_file(f)
+              for f in csv_files if f != DATATYPES_FILE}
+
+    bundle = {
+        "version": BUNDLE_VERSION,
+        "manifest": manifest,
+        "definitions": definitions,
+        "files": domains,
+        "values": values,
+    }
+    with open(path, 'wb') as file_:
+        file_.write(marshal.dumps(bundle))
+    return path
+
+
+def _get_csv_files(domain):
+    domain = os.path.join(*domain.split("/"))
+
+    # We are fetching both by filename and dir name
+    # so that regions/kenya will match anything in
+    # `datatypes/values/regions/kenya/*.csv`
+    # and/or `datatypes/values/regions/kenya.csv`
+    #
+    # There is probably an easier way to do this
+    # FIXME the below function fetches /foo/bar/regions/kenya as well, but we probably want ^regions/kenya
+    value_path_1 = os.path.join(VALUES_DIR, domain)
+    value_path_2 = VALUES_DIR
+    files_1 = chain.from_iterable(iglob(os.path.join(root, '*.csv'))
+                                  for root, dirs, files in os.walk(value_path_1))
+    files_2 = chain.from_iterable(iglob(os.path.join(root, domain + '.csv'))
+                                  for root, dirs, files in os.walk(value_path_2))
+    for f in chain(files_1, files_2):
+        yield f
+
 
 class Datatype(object):
-    """Represent a datatype, initiated by id."""
+    """Represent a datatype, initiated by id.
 
-    def __init__(self, id):
+    There is only one Datatype object per id, shared by all dimensions
+    using it. It should be treated as immutable.
+    """
+
+    def __new__(cls, id):
         """Id is a datatype from datatypes.csv."""
-        self.id = id
-        self.allowed_values = ValueList()
-
-        data = None
-        with open(DATATYPES_FILE, 'r') as csvfile:
-            reader = DictReader(csvfile)
-            for row in reader:
-                if row["id"] == id:
-                    data = row
-                    break
+        try:
+            return _registry[id]
+        except KeyError:
+            pass
+        data = _get_definitions().get(id)
         if data is None:
             raise(NoSuchDatatype)
-        self.value_type = data["value_type"]
-        self.description = data["description"]
-        domain = data["allowed_values"]
-        if domain:
-            for file_ in self._get_csv_files(domain):
-                with open(file_, 'r') as csvfile:
-                    reader = DictReader(csvfile)
-                    dialect_names = [x
-                                     for x in reader.fieldnames
-                                     if x.startswith("dialect:")]
-                    self.dialects = [d[8:] for d in dialect_names]
-                    for row in reader:
-                        value = DimensionValue(row["id"],
-                                               self,
-                                               label=row["label"])
-                        dialects = {x: None for x in self.dialects}
-
-                        for d in dialect_names:
-                            # parse this cell as a csv row
-                            csvreader = CsvReader([row[d]],
-                                                  delimiter=VALUE_DELIMITOR,
-                                                  skipinitialspace=True,
-                                                  strict=True)
-                            values = next(csvreader)
-                            dialects[d[8:]] = values
-                        value.dialects = dialects
-                        self.allowed_values.append(value)
+        with _lock:
+            if id not in _registry:
+                self = super(Datatype, cls).__new__(cls)
+                set_ = super(Datatype, self).__setattr__
+                set_("id", id)
+                set_("value_type", data["value_type"])
+                set_("description", data["description"])
+                set_("domain", data["allowed_values"])
+                set_("_allowed_values", None)
+                set_("_dialects", None)
+                set_("_dialect_indexes", {})
+                set_("_translation_tables", {})
+                set_("_conversion_tables", {})
+                _registry[id] = self
+        return _registry[id]
+
+    def __init__(self, id):
+        """Everything is set up once, by __new__."""
+        pass
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Datatypes are shared, and can not be modified.")
+
+    @property
+    def allowed_values(self):
+        """Return a ValueList with all allowed values, loading it if needed."""
+        if self._allowed_values is None:
+            self._load_values()
+        return self._allowed_values
+
+    @property
+    def dialects(self):
+        """Return a list of all dialects used by our allowed values."""
+        if self._dialects is None:
+            self._load_values()
+        return self._dialects
+
+    def _load_values(self):
+        """Read the values of our domain, if any, from bundle or csv files."""
+        with _lock:
+            if self._allowed_values is not None:
+                # Loaded by another thread while we were waiting
+                return
+            allowed_values = ValueList()
+            all_dialects = []
+            if self.domain:
+                bundle = _get_bundle()
+                if bundle and self.domain in bundle["files"]:
+                    files = [bundle["values"][f]
+                             for f in bundle["files"][self.domain]]
+                else:
+                    files = [_parse_values_file(f)
+                             for f in self._get_csv_files(self.domain)]
+                for dialects, values in files:
+                    all_dialects += [d for d in dialects
+                                     if d not in all_dialects]
+                    for id_, label, value_dialects in values:
+                        value = DimensionValue(id_, self, label=label)
+                        value.dialects = dict(value_dialects)
+                        # Shared by every dimension in the process
+                        allowed_values.append(value.freeze())
+            set_ = super(Datatype, self).__setattr__
+            set_("_dialects", all_dialects)
+            # Set last, as this marks the values as loaded
+            set_("_allowed_values", allowed_values.freeze())
+
+    def dialect_index(self, dialect):
+        """Return a dict mapping values in a dialect to allowed values.
+
+        The index is built on first use, and then reused.
+        """
+        if dialect not in self._dialect_indexes:
+            index = build_dialect_index(self.allowed_values, dialect)
+            self._dialect_indexes.setdefault(dialect, index)
+        return self._dialect_indexes[dialect]
+
+    def translation_table(self, dialect):
+        """Return a dict mapping allowed values to their value in a dialect.
+
+        Values with more than one alias in the dialect are translated to
+        all of them, comma separated. The table is built on first use,
+        and then reused.
+        """
+        if dialect not in self._translation_tables:
+            table = {}
+            for value in self.allowed_values:
+                aliases = value.dialects.get(dialect)
+                if aliases is not None:
+                    table.setdefault(value.value,
+                                     ",".join([x.replace(",", "\\,")
+                                               for x in aliases]))
+            self._translation_tables.setdefault(dialect, table)
+        return self._translation_tables[dialect]
+
+    def translate_many(self, values, dialect, default=_NOTHING):
+        """Translate a list (or array) of allowed values to a dialect.
+
+        Returns a list. Values that can not be translated get `default`,
+        or raise NoSuchItem if no default is given.
+        """
+        table = self.translation_table(dialect)
+        if default is _NOTHING:
+            try:
+                return [table[v] for v in values]
+            except KeyError as e:
+                raise NoSuchItem("%s can not be translated to %s" %
+                                 (e.args[0], dialect))
+        get = table.get
+        return [get(v, default) for v in values]
+
+    def conversion_table(self, from_dialect, to_dialect):
+        """Return a dict mapping values in one dialect to another.
+
+        Use None for the allowed values themselves. The table is built
+        on first use, from the dialect index of `from_dialect` and the
+        translation table of `to_dialect`, and then reused.
+        """
+        key = (from_dialect, to_dialect)
+        if key not in self._conversion_tables:
+            if to_dialect is None:
+                targets = None
+            else:
+                targets = self.translation_table(to_dialect)
+            if from_dialect is None:
+                sources = ((v.value, v) for v in self.allowed_values)
+            else:
+                sources = self.dialect_index(from_dialect).items()
+            table = {}
+            for alias, value in sources:
+                if targets is None:
+                    table[alias] = value.value
+                elif value.value in targets:
+                    table[alias] = targets[value.value]
+            self._conversion_tables.setdefault(key, table)
+        return self._conversion_tables[key]
+
+    def convert(self, values, from_dialect, to_dialect, default=_NOTHING):
+        """Convert a list (or array) of values between two dialects.
+
+        E.g. `convert(["1440"], "skatteverket", "wikidata")`. Use None
+        for the allowed values themselves. Returns a list. Values that
+        can not be converted get `default`, or raise NoSuchItem if no
+        default is given.
+        """
+        table = self.conversion_table(from_dialect, to_dialect)
+        if default is _NOTHING:
+            try:
+                return [table[v] for v in values]
+            except KeyError as e:
+                raise NoSuchItem("%s can not be converted from %s to %s" %
+                                 (e.args[0], from_dialect, to_dialect))
+        get = table.get
+        return [get(v, default) for v in values]
 
     def _get_csv_files(self, domain):
-        domain = os.path.join(*domain.split("/"))
-
-        # We are fetching both by filename and dir name
-        # so that regions/kenya will match anything in
-        # `datatypes/values/regions/kenya/*.csv`
-        # and/or `datatypes/values/regions/kenya.csv`
-        #
-        # There is probably an easier way to do this
-        # FIXME the below function fetches /foo/bar/regions/kenya as well, but we probably want ^regions/kenya
-        value_path_1 = os.path.join(DIR_PATH, "datatypes", "values", domain)
-        value_path_2 = os.path.join(DIR_PATH, "datatypes", "values")
-        files_1 = chain.from_iterable(iglob(os.path.join(root, '*.csv'))
-                                      for root, dirs, files in os.walk(value_path_1))
-        files_2 = chain.from_iterable(iglob(os.path.join(root, domain + '.csv'))
-                                      for root, dirs, files in os.walk(value_path_2))
-        for f in chain(files_1, files_2):
-            yield f
+        return _get_csv_files(domain)
+
+    def __reduce__(self):
+        """Pickle by id, so that unpickling returns the shared object."""
+        return (Datatype, (self.id,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __str__(self):
         return str(self.id)
 
     def __repr__(self):
         return '<Datatype: %s>' % str(self)
+
+
+def build_dialect_index(values, dialect):
+    """Map every alias of a dialect to the value it belongs to.
+
+    If the same alias is used for more than one value, the first one
+    wins, just like when looping through the values.
+    """
+    index = {}
+    for value in values:
+        # Not all values have all dialects
+        for alias in value.dialects.get(dialect) or []:
+            index.setdefault(alias, value)
+    return index
+
+
+def get_inverted_index():
+    """Return a dict mapping every known value to where it is used.
+
+    Covers all dialects of all datatypes, with values mapped to a list
+    of (datatype id, dialect) pairs. The dialect is None for the allowed
+    values themselves. Built on first use.
+    """
+    global _inverted_index
+    if _inverted_index is None:
+        with _lock:
+            if _inverted_index is None:
+                index = {}
+                for id_ in sorted(_get_definitions()):
+                    datatype = Datatype(id_)
+                    if not datatype.domain:
+                        continue
+                    for value in datatype.allowed_values:
+                        _add_to_index(index, value.value, (id_, None))
+                        for dialect, aliases in value.dialects.items():
+                            for alias in aliases or []:
+                                _add_to_index(index, alias, (id_, dialect))
+                _inverted_index = index
+    return _inverted_index
+
+
+def _add_to_index(index, value, key):
+    keys = index.setdefault(value, [])
+    if key not in keys:
+        keys.append(key)
+
+
+def detect_dialect(values, sample=1000):
+    """Guess the datatype and dialect of a list of values.
+
+    Up to `sample` distinct values are looked up in the inverted index.
+    Returns a list of (Datatype, dialect, coverage) tuples, best first,
+    where coverage is the share of the sampled values that belong to
+    that dialect. The dialect is None for the allowed values themselves.
+    """
+    distinct = list(OrderedDict.fromkeys(values))
+    if len(distinct) > sample:
+        step = len(distinct) / float(sample)
+        distinct = [distinct[int(i * step)] for i in range(sample)]
+    if not distinct:
+        return []
+
+    index = get_inverted_index()
+    hits = {}
+    for value in distinct:
+        if not isinstance(value, unicode):
+            value = unicode(value)
+        for key in index.get(value, ()):
+            hits[key] = hits.get(key, 0) + 1
+    ranked = sorted(hits.items(),
+                    key=lambda x: (-x[1], x[0][0], x[0][1] or ""))
+    return [(Datatype(id_), dialect, count / float(len(distinct)))
+            for (id_, dialect), count in ranked]
@@ -4,10 +4,11 @@
     This is intended to be a minimal example of a scraper
     using Beautiful Soup.
 """
-import requests
 from bs4 import BeautifulSoup
 from statscraper import BaseScraper, Dataset, Dimension, Result
 
+URL = "http://web05.lansstyrelsen.se/transtat_O/transtat.asp"
+
 
 class Cranes(BaseScraper):
 
@@ -29,7 +30,7 @@ class Cranes(BaseScraper):
         yield Dimension(u"year", datatype="year")
 
     def _fetch_data(self, dataset, query=None):
-        html = requests.get("http://web05.lansstyrelsen.se/transtat_O/transtat.asp").text
+        html = self.transport.get(URL).text
         soup = BeautifulSoup(html, 'html.parser')
         table = soup.find("table", "line").find_all("table")[2].findNext("table")
         rows = table.find_all("tr")
@@ -10,7 +10,6 @@ If used directly, an API endpoint must be set:
     scraper.base_url = "http://api.example.com/"
 """
 
-import requests
 from statscraper import (BaseScraper, Collection, Result,
                          Dataset, Dimension, InvalidData)
 from statscraper.compat import JSONDecodeError
@@ -38,7 +37,7 @@ class PXWeb(BaseScraper):
         return "/".join([self.base_url, path])
 
     def _fetch_itemslist(self, item):
-        data = requests.get(self._api_path(item)).json()
+        data = self.transport.get(self._api_path(item)).json()
 
         for d in data:
             if d["type"] == "l":
@@ -47,7 +46,7 @@ class PXWeb(BaseScraper):
                 yield Dataset(d["id"], label=d["text"], blob=d)
 
     def _fetch_dimensions(self, dataset):
-        data = requests.get(self._api_path(dataset)).json()
+        data = self.transport.get(self._api_path(dataset)).json()
         try:
             for d in data["variables"]:
                 yield Dimension(d["code"],
@@ -74,7 +73,7 @@ class PXWeb(BaseScraper):
             }
         }
         try:
-            raw = requests.post(self._api_path(dataset), json=body)
+            raw = self.transport.post(self._api_path(dataset), json=body)
             if raw.headers["content-type"] == "text/html":
                 # This is an error message
                 raise(InvalidData(f"""Error message from PX Web:
@@ -1,4 +1,5 @@
 """A wrapper around the SCB API."""
+from statscraper import RateLimiter
 from .PXWebScraper import PXWeb, Dimension
 
 
@@ -6,6 +7,8 @@ class SCB(PXWeb):
     """The SCB API uses PXWeb. We just hardcode the url."""
 
     base_url = 'https://api.scb.se/OV0104/v1/doris/sv/ssd'
+    # SCB allows 10 calls per 10 seconds
+    rate_limits = {"api.scb.se": RateLimiter(10, 10)}
     COUNTIES = [
         "01", "03", "04", "05", "06", "07", "08", "09", "10", "12", "13",
         "14", "17", "18", "19", "20", "21", "22", "23", "24", "25"
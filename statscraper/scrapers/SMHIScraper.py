@@ -3,7 +3,7 @@ try:
 except ImportError:
     import io as StringIO
 
-import requests
+import asyncio
 import csv
 from datetime import datetime
 from bs4 import BeautifulSoup
@@ -27,7 +27,7 @@ class SMHI(BaseScraper):
         """ Get a all available apis
         """
         if current_item.is_root:
-            html = requests.get(self.base_url).text
+            html = self.transport.get(self.base_url).text
             soup = BeautifulSoup(html, 'html.parser')
             for item_html in soup.select(".row .col-md-6"):
                 try:
@@ -69,10 +69,36 @@ class SMHI(BaseScraper):
         else:
             yield None
 
-    def _fetch_data(self, dataset, query={}, include_inactive_stations=False):
+    def _fetch_data(self, dataset, query=None, include_inactive_stations=False):
         """ Should yield dataset rows
         """
-        parameter = dataset
+        query = self._prepare_query(dataset, query, include_inactive_stations)
+
+        # Step 3: Get data
+        for station, period, url in self._data_urls(dataset, query):
+            r = self.transport.get(url)
+            for datapoint in self._parse_data(dataset, station, period, url, r):
+                yield datapoint
+
+    async def _afetch_data(self, dataset, query=None,
+                           include_inactive_stations=False):
+        """ Yield dataset rows, getting all stations and periods at once
+        """
+        query = await self.transport.arun(self._prepare_query, dataset,
+                                          query, include_inactive_stations)
+
+        # Rows come in the same order as from _fetch_data
+        urls = list(self._data_urls(dataset, query))
+        responses = await asyncio.gather(*[self.transport.aget(url)
+                                           for station, period, url in urls])
+        for (station, period, url), r in zip(urls, responses):
+            for datapoint in self._parse_data(dataset, station, period, url, r):
+                yield datapoint
+
+    def _prepare_query(self, dataset, query, include_inactive_stations):
+        """ Return a copy of the query, with stations and periods as lists
+        """
+        query = dict(query or {})
         station_dim = dataset.dimensions["station"]
         all_stations = station_dim.allowed_values
         # Step 1: Prepare query
@@ -100,40 +126,46 @@ class SMHI(BaseScraper):
             if period not in PERIODS:
                 msg = u"{} is not an allowed period".format(period)
                 raise Exception(msg)
+        return query
 
-        # Step 3: Get data
+    def _data_urls(self, dataset, query):
+        """ Yield (station, period, url) for every csv file to get
+        """
         for station in query["station"]:
             for period in query["period"]:
                 url = dataset.url.replace(
                     ".json",
                     f"/station/{station.key}/period/{period}/data.csv"
                 )
-                r = requests.get(url)
+                yield station, period, url
 
-                if r.status_code == 200:
-                    raw_data = DataCsv().from_string(r.content).to_dictlist()
+    def _parse_data(self, parameter, station, period, url, r):
+        """ Yield datapoints from the response for one csv file
+        """
+        if r.status_code == 200:
+            raw_data = DataCsv().from_string(r.content).to_dictlist()
 
-                    # TODO: This is a very hard coded parse function
-                    # Expects fixed start row and number of cols
-                    for row in raw_data:
-                        value_col = parameter.id.split(",")[0]
-                        value = float(row[value_col])
+            # TODO: This is a very hard coded parse function
+            # Expects fixed start row and number of cols
+            for row in raw_data:
+                value_col = parameter.id.split(",")[0]
+                value = float(row[value_col])
 
-                        row["parameter"] = parameter.id
-                        row["station"] = station.label
-                        row["station_key"] = station.key
-                        row["period"] = period
+                row["parameter"] = parameter.id
+                row["station"] = station.label
+                row["station_key"] = station.key
+                row["period"] = period
 
-                        row.pop(value_col, None)
+                row.pop(value_col, None)
 
-                        datapoint = Result(value, row)
+                datapoint = Result(value, row)
 
-                        yield datapoint
+                yield datapoint
 
-                elif r.status_code == 404:
-                    print("Warning no data at {}".format(url))
-                else:
-                    raise Exception("Connection error for {}".format(url))
+        elif r.status_code == 404:
+            print("Warning no data at {}".format(url))
+        else:
+            raise Exception("Connection error for {}".format(url))
 
 
 class API(Collection):
@@ -158,7 +190,7 @@ class API(Collection):
         # Update blob
         error_msg = "Scraper does not support parsing of '{}' yet.".format(self.id)
         try:
-            r = requests.get(self.url)
+            r = self.scraper.transport.get(self.url)
         except Exception:
             # Catch ie. "opendata-download-grid.smhi.se"
             raise NotImplementedError(error_msg)
@@ -211,7 +243,7 @@ class SMHIDataset(Dataset):
     @property
     def json(self):
         if not hasattr(self, "_json"):
-            self._json = requests.get(self.url).json()
+            self._json = self.scraper.transport.get(self.url).json()
         return self._json
 
     def get_stations_list(self):
@@ -238,7 +270,7 @@ class SMHIDataset(Dataset):
             f"/station/{station_key}/period/{period}/data.csv"
         )
 
-        r = requests.get(url)
+        r = self.scraper.transport.get(url)
         if r.status_code == 200:
             return DataCsv().from_string(r.content)
         else:
@@ -1,18 +1,16 @@
-import requests
 from bs4 import BeautifulSoup
-import requests_cache
 from requests.exceptions import RequestException
 from itertools import product
 import re
 
-requests_cache.install_cache()
-
 from statscraper.base_scraper import (BaseScraper, Collection,
                                       Dataset, Dimension, Result)
+from statscraper.cache import FileHTTPCache
 
 BASE_URL = u"http://www.vantetider.se/Kontaktkort/"
 
 class VantetiderScraper(BaseScraper):
+    http_cache = FileHTTPCache("http_cache")
 
     def _fetch_itemslist(self, current_item):
         # Get start page
@@ -141,7 +139,7 @@ class VantetiderScraper(BaseScraper):
         """ Get html from url
         """
         self.log.info(u"/GET {}".format(url))
-        r = requests.get(url)
+        r = self.transport.get(url)
         if hasattr(r, 'from_cache'):
             if r.from_cache:
                 self.log.info("(from cache)")
@@ -153,7 +151,7 @@ class VantetiderScraper(BaseScraper):
 
     def _post_html(self, url, payload):
         self.log.info(u"/POST {} with {}".format(url, payload))
-        r = requests.post(url, payload)
+        r = self.transport.post(url, payload)
         if r.status_code != 200:
             throw_request_err(r)
 
@@ -163,7 +161,7 @@ class VantetiderScraper(BaseScraper):
         """ Get json from url
         """
         self.log.info(u"/GET " + url)
-        r = requests.get(url)
+        r = self.transport.get(url)
         if hasattr(r, 'from_cache'):
             if r.from_cache:
                 self.log.info("(from cache)")
@@ -2,6 +2,7 @@
 
 import pandas as pd
 import json
+from io import BytesIO
 from statscraper import BaseScraper, Dataset, Dimension, Result
 
 MONTHS = ['januari', 'februari', 'mars', 'april', 'maj', 'juni'
@@ -58,7 +59,8 @@ class Vehicles(BaseScraper):
         for file in files:
             year, month = file
             url = self.BASE_URL.format(year=year, month=MONTHS[month])
-            frame = self._clean_data(pd.read_excel(url), year, month)
+            excel = BytesIO(self.transport.get(url).content)
+            frame = self._clean_data(pd.read_excel(excel), year, month)
             frames.append(frame)
 
         # Yield individual rows of type Result from the dataframe
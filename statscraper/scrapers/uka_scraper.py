@@ -3,10 +3,13 @@ u""" A scraper to fetch Swedish university application statistics from
  the Swedish Higher Education Authority (Universitetskanslerämbetet, UKÄ),
  at http://statistik.uka.se
 """
+import asyncio
 from statscraper import BaseScraper, Dataset, Dimension, Result, Collection
-import requests
 from bs4 import BeautifulSoup
 
+URL = "http://statistik.uka.se/4.5d85793915901d205f935d0f.12.5d85793915901d205f965eab.portlet?action=resultat&view=resultTable&frageTyp=3&frageNr=240&tid=%s&grupp1=%s&grupp2=%s"
+THENMAP_URL = "http://api.thenmap.net/v1/se-7/data/%s?data_props=name|kommunkod"
+
 
 class UKA(BaseScraper):
 
@@ -35,8 +38,31 @@ class UKA(BaseScraper):
                         domain="sweden/municipalities")
 
     def _fetch_data(self, dataset, query):
-        url = "http://statistik.uka.se/4.5d85793915901d205f935d0f.12.5d85793915901d205f965eab.portlet?action=resultat&view=resultTable&frageTyp=3&frageNr=240&tid=%s&grupp1=%s&grupp2=%s"
-        thenmap_url = "http://api.thenmap.net/v1/se-7/data/%s?data_props=name|kommunkod"
+        for t, year, semester in self._terms(query):
+            # Get all municipalities, and their codes, from this year
+            municipalities = self.transport.get(THENMAP_URL % year).json()
+            for municipality, c, m in self._municipalities(municipalities):
+                html = self.transport.get(URL % (t, c, m)).text
+                for result in self._parse_table(html, municipality,
+                                                semester, year):
+                    yield result
+
+    async def _afetch_data(self, dataset, query):
+        """ Get the pages of all municipalities in a term at once. """
+        for t, year, semester in self._terms(query):
+            municipalities = (await self.transport.aget(THENMAP_URL % year)).json()
+            municipalities = list(self._municipalities(municipalities))
+            responses = await asyncio.gather(*[
+                self.transport.aget(URL % (t, c, m))
+                for municipality, c, m in municipalities
+            ])
+            for (municipality, c, m), r in zip(municipalities, responses):
+                for result in self._parse_table(r.text, municipality,
+                                                semester, year):
+                    yield result
+
+    def _terms(self, query):
+        """ Yield (term, year, semester) for every term in the query. """
         # 6 is 1993, the first year in the db
         if query is None:
             query = {}
@@ -48,25 +74,28 @@ class UKA(BaseScraper):
         terms = range(start,
                       start + query["semesters"] + 2)
         for t in terms:
-            # Get all municipalities, and their codes, from this year
             year = ((t - 5) / 2) + 1993
             semester = ["HT", "VT"][t % 2]
-            municipalities = requests.get(thenmap_url % year).json()
-            for id_, municipality_ in municipalities["data"].items():
-                municipality = municipality_.pop()
-                code = municipality["kommunkod"].zfill(4)
-                c, m = code[:2], code[2:]
-                html = requests.get(url % (t, c, m)).text
-                soup = BeautifulSoup(html, 'html.parser')
-                table = soup.find("table")
-                # The first rows are headers, the last are empty
-                rows = table.find_all("tr")[5:-2]
-                for row in rows:
-                    cells = row.find_all("td")
+            yield t, year, semester
+
+    def _municipalities(self, municipalities):
+        """ Yield (municipality, county code, municipality code). """
+        for id_, municipality_ in municipalities["data"].items():
+            municipality = municipality_.pop()
+            code = municipality["kommunkod"].zfill(4)
+            yield municipality, code[:2], code[2:]
+
+    def _parse_table(self, html, municipality, semester, year):
+        soup = BeautifulSoup(html, 'html.parser')
+        table = soup.find("table")
+        # The first rows are headers, the last are empty
+        rows = table.find_all("tr")[5:-2]
+        for row in rows:
+            cells = row.find_all("td")
 
-                    yield Result(cells[2].text.strip(), {
-                        "municipality": municipality["name"],
-                        "school": cells[0].text.strip(),
-                        "semester": semester,
-                        "year": year,
-                    })
+            yield Result(cells[2].text.strip(), {
+                "municipality": municipality["name"],
+                "school": cells[0].text.strip(),
+                "semester": semester,
+                "year": year,
+            })
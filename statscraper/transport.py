@@ -0,0 +1,340 @@
+"""HTTP transport shared by all requests of a scraper.
+
+Every scraper has a `transport`, holding a requests session with a
+pool of keep-alive connections per host, so that a scraper making
+thousands of requests to the same site does not open a new connection
+for every one of them. Scrapers should use it instead of calling
+`requests.get` and `requests.post` directly:
+
+    data = self.transport.get(url).json()
+
+From async code, use `aget` and `apost`, that don't block the event
+loop:
+
+    response = await self.transport.aget(url)
+
+Pool sizes, timeouts and headers can be changed by giving a scraper a
+transport of its own:
+
+    scraper.transport = Transport(pool_size=50, timeout=30,
+                                  pool_sizes={"https://api.scb.se": 10})
+
+The `http_cache` and `rate_limits` of the scraper class are added to
+it, unless the transport has a cache, or a limit for the same host, of
+its own.
+
+GET responses can be cached, by giving the transport an HTTP cache
+(see `statscraper.cache`). Scraper classes opt in with `http_cache`:
+
+    class MyScraper(BaseScraper):
+        http_cache = SQLiteHTTPCache("http.sqlite", ttl=24 * 3600)
+
+Cached responses are used as is until their time to live is out. After
+that, they are revalidated with a conditional request, that costs a
+304 Not Modified response, rather than a new download, if the server
+supports ETag or Last-Modified headers. Counts of cache hits, misses and
+revalidated responses are kept in `Transport.stats`.
+
+Hosts with request quotas can be given a RateLimiter. Scraper classes
+set theirs in `rate_limits`, so that all scrapers of the class share
+the quota:
+
+    class SCB(PXWeb):
+        rate_limits = {"api.scb.se": RateLimiter(10, 10)}  # 10 calls / 10 s
+
+Requests answered with 429 Too Many Requests (or 503 with a
+Retry-After header) are retried, after waiting as long as the server
+asks, or with exponential backoff.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
+from threading import Condition, Lock
+from time import monotonic, sleep, time
+from urllib.parse import urlparse
+import asyncio
+
+from requests import Session, Response
+from requests.adapters import HTTPAdapter
+from requests.models import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_POOL_SIZE = 10  # Connections kept open per host
+DEFAULT_TIMEOUT = (10, 120)  # Seconds to connect, and to wait for data
+DEFAULT_MAX_IN_FLIGHT = 100  # Async requests made at the same time
+DEFAULT_MAX_BACKOFFS = 5  # Retries of throttled requests
+DEFAULT_HEADERS = {
+    "User-Agent": "statscraper (https://github.com/jplusplus/statscraper)",
+}
+
+
+class RateLimiter(object):
+    """Keeps the requests to a host within a quota of `calls` per `period`
+    seconds, and at most `max_in_flight` requests at the same time.
+
+    A token bucket of `calls` tokens. Every request takes a token, and it
+    is given back `period` seconds after the response came back. As the
+    server sees the request somewhere in between, it never sees more than
+    `calls` requests in any `period`, while a full quota can be used at
+    once. Limiters are thread safe, and can be shared by transports.
+    """
+
+    def __init__(self, calls, period=1.0, max_in_flight=None):
+        self.calls = calls
+        self.period = period
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._returned = deque()  # When tokens in use were returned
+        self._not_before = 0  # Wait until then, when backing off
+        self._condition = Condition()
+
+    def acquire(self):
+        """Wait for a token, and take it."""
+        with self._condition:
+            while True:
+                now = monotonic()
+                while self._returned and \
+                        self._returned[0] + self.period <= now:
+                    self._returned.popleft()
+                used = self._in_flight + len(self._returned)
+                wait = self._not_before - now
+                if used >= self.calls and self._returned:
+                    wait = max(wait, self._returned[0] + self.period - now)
+                busy = used >= self.calls or (
+                    self.max_in_flight is not None and
+                    self._in_flight >= self.max_in_flight)
+                if wait <= 0 and not busy:
+                    self._in_flight += 1
+                    return
+                # Wait for a token to come back, or a request to finish
+                self._condition.wait(wait if wait > 0 else None)
+
+    def release(self):
+        """Give back a token, once the response has come back."""
+        with self._condition:
+            self._in_flight -= 1
+            self._returned.append(monotonic())
+            self._condition.notify_all()
+
+    def backoff(self, seconds):
+        """Don't make any more requests for `seconds`."""
+        with self._condition:
+            self._not_before = max(self._not_before, monotonic() + seconds)
+
+    def __repr__(self):
+        return "<RateLimiter: %s calls per %s s>" % (self.calls, self.period)
+
+
+class Transport(object):
+    """Makes HTTP requests over a pooled, keep-alive requests session.
+
+    Responses are the usual requests.Response objects. The session is
+    safe to share between the threads of a scraper.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 headers=None, pool_sizes=None, max_retries=0,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, cache=None,
+                 namespace="", rate_limits=None,
+                 max_backoffs=DEFAULT_MAX_BACKOFFS):
+        """Set up a session.
+
+        pool_size: Number of connections to keep open per host
+        timeout: Default timeout, in seconds, or a (connect, read) tuple
+        headers: Headers to send with every request, on top of the
+                 default ones
+        pool_sizes: Pool sizes for specific hosts (or any URL prefix),
+                    e.g. {"https://api.scb.se": 20}
+        max_retries: Number of retries for failed connections
+        max_in_flight: Number of async requests to make at the same time
+        cache: An HTTP cache for GET responses, e.g. a SQLiteHTTPCache
+        namespace: Keeps the cached responses of this transport apart
+                   from others using the same cache. Scrapers use their
+                   class name.
+        rate_limits: RateLimiters by host name, e.g.
+                     {"api.scb.se": RateLimiter(10, 10)}
+        max_backoffs: Number of times to retry a throttled request
+        """
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.cache = cache
+        self.namespace = namespace
+        self.rate_limits = dict(rate_limits or {})
+        self.max_backoffs = max_backoffs
+        self._stats = {"requests": 0, "hits": 0, "misses": 0,
+                       "revalidated": 0, "throttled": 0}
+        self._stats_lock = Lock()
+        # Threads are only started once async requests are made
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self.session = Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        adapter = self._adapter(pool_size, max_retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        for prefix, size in (pool_sizes or {}).items():
+            self.session.mount(prefix, self._adapter(size, max_retries))
+
+    @staticmethod
+    def _adapter(pool_size, max_retries):
+        return HTTPAdapter(pool_connections=pool_size,
+                           pool_maxsize=pool_size,
+                           max_retries=max_retries)
+
+    def request(self, method, url, **kwargs):
+        """Make a request. Takes the same arguments as requests.request.
+
+        GET requests are served from the cache, if there is one.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if self.cache is None or method.upper() != "GET":
+            return self._send(method, url, **kwargs)
+        return self._cached_get(url, **kwargs)
+
+    def _send(self, method, url, **kwargs):
+        """Make a request within the rate limits of the host, retrying it
+        if the server asks us to slow down.
+        """
+        limiter = self.rate_limits.get(urlparse(url).hostname)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                self._count("requests")
+                response = self.session.request(method, url, **kwargs)
+            finally:
+                if limiter is not None:
+                    limiter.release()
+            if response.status_code not in (429, 503) or \
+               attempt >= self.max_backoffs:
+                return response
+            delay = _retry_after(response)
+            if delay is None:
+                if response.status_code == 503:
+                    # Down, rather than busy
+                    return response
+                delay = 2 ** attempt
+            self._count("throttled")
+            attempt += 1
+            if limiter is not None:
+                # Hold back all other requests to the host too
+                limiter.backoff(delay)
+            else:
+                sleep(delay)
+
+    def _cached_get(self, url, params=None, headers=None, **kwargs):
+        """GET from the cache, revalidating expired responses."""
+        request = PreparedRequest()
+        request.prepare_url(url, params)
+        url = request.url
+        entry = self.cache.get(self.namespace, url)
+        if entry is not None and (entry["expires"] is None or
+                                  entry["expires"] > time()):
+            self._count("hits")
+            return _cached_response(entry)
+
+        headers = dict(headers or {})
+        if entry is not None:
+            # Ask the server if our copy is still good. Header names
+            # keep the case the server sent them in.
+            cached_headers = CaseInsensitiveDict(entry["headers"])
+            if cached_headers.get("ETag"):
+                headers["If-None-Match"] = cached_headers["ETag"]
+            if cached_headers.get("Last-Modified"):
+                headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+        response = self._send("GET", url, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self._count("revalidated")
+            self.cache.set(self.namespace, url, entry)
+            return _cached_response(entry)
+
+        self._count("misses")
+        response.from_cache = False
+        cache_control = response.headers.get("Cache-Control", "")
+        if response.status_code == 200 and "no-store" not in cache_control:
+            self.cache.set(self.namespace, url, {
+                "url": response.url,
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "encoding": response.encoding,
+                "content": response.content,
+            })
+        return response
+
+    def _count(self, counter):
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+    @property
+    def stats(self):
+        """Return a dict with the number of requests made, cache hits,
+        misses and revalidated responses, and throttled requests.
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+    async def arequest(self, method, url, **kwargs):
+        """Make a request, without blocking the event loop.
+
+        The request is made over the same session as `request`, by one of
+        `max_in_flight` worker threads.
+        """
+        return await self.arun(self.request, method, url, **kwargs)
+
+    async def aget(self, url, **kwargs):
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url, data=None, json=None, **kwargs):
+        return await self.arequest("POST", url, data=data, json=json,
+                                   **kwargs)
+
+    async def arun(self, function, *args, **kwargs):
+        """Call a blocking function in one of the worker threads."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(function, *args, **kwargs))
+
+    def close(self):
+        """Close all pooled connections."""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+def _cached_response(entry):
+    """Return a requests.Response made from a cache entry."""
+    response = Response()
+    response.url = entry["url"]
+    response.status_code = entry["status_code"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.encoding = entry["encoding"]
+    response._content = entry["content"]
+    response.from_cache = True
+    return response
+
+
+def _retry_after(response):
+    """Return the number of seconds a server asks us to wait, or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0, (date - datetime.now(timezone.utc)).total_seconds())
@@ -1,6 +1,6 @@
 """Test datatypes."""
 from statscraper.datatypes import Datatype
-from statscraper import Dimension, DimensionValue
+from statscraper import Dimension, DimensionValue, ValueList
 
 
 def test_allowed_values():
@@ -14,3 +14,38 @@ def test_b():
     d = Dimension("municipality", datatype="region", domain="sweden/municipalities")
     dv = DimensionValue("Ale kommun", d)
     assert(dv.translate("numerical") == "1440")
+
+
+def test_shared_values_frozen():
+    """Allowed values are shared by all dimensions, and can't be changed."""
+    d = Dimension("municipality", datatype="region")
+    value = d.allowed_values["Ale kommun"]
+    try:
+        value.value = "Ole kommun"
+        assert False
+    except AttributeError:
+        pass
+    assert Datatype("region").allowed_values["Ale kommun"] is value
+    assert value.copy().value == "Ale kommun"
+
+
+def test_shared_list_frozen():
+    """The shared list of allowed values can't be changed either."""
+    d = Dimension("municipality", datatype="region")
+    size = len(d.allowed_values)
+    for change in (lambda x: x.append(DimensionValue("Ole kommun", d)),
+                   lambda x: x.extend([]),
+                   lambda x: x.insert(0, x[0]),
+                   lambda x: x.__delitem__(0),
+                   lambda x: x.__setitem__(slice(0, 2), []),
+                   lambda x: x.pop(),
+                   lambda x: x.sort()):
+        try:
+            change(d.allowed_values)
+            assert False
+        except AttributeError:
+            pass
+    assert len(Datatype("region").allowed_values) == size
+    values = ValueList(d.allowed_values)
+    values.pop()
+    assert len(values) == size - 1
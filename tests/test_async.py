@@ -0,0 +1,98 @@
+"""Tests for the async scraper protocol."""
+import asyncio
+from unittest import TestCase
+
+from statscraper import (BaseScraper, Collection, Dataset, Dimension, Result,
+                         ROOT)
+
+
+class Scraper(BaseScraper):
+    """A scraper with sync methods only.
+
+    ROOT - Collection_1 - [Dataset_1, Dataset_2]
+    """
+
+    def _fetch_itemslist(self, item):
+        if item.id == ROOT:
+            yield Collection("Collection_1")
+        else:
+            yield Dataset("Dataset_1")
+            yield Dataset("Dataset_2")
+
+    def _fetch_dimensions(self, dataset):
+        yield Dimension("municipality", datatype="region")
+        yield Dimension("row")
+
+    def _fetch_data(self, dataset, query=None):
+        # The cursor is where the sync API would have put it
+        assert self.current_item is dataset
+        for i in range(2500):
+            yield Result(i, {"municipality": "Robertsfors kommun",
+                             "row": i})
+
+
+class AsyncScraper(Scraper):
+    """A scraper making its "requests" at the same time."""
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def _afetch_data(self, dataset, query=None):
+        async def request(i):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return Result(i, {"municipality": "Robertsfors kommun",
+                              "row": i})
+        for result in await asyncio.gather(*[request(i) for i in range(50)]):
+            yield result
+
+
+class TestAsync(TestCase):
+
+    def test_aitems(self):
+        """Items are fetched through the sync methods, in worker threads."""
+        scraper = Scraper()
+        items = asyncio.run(scraper.aitems())
+        self.assertEqual([x.id for x in items], ["Collection_1"])
+        datasets = asyncio.run(items["Collection_1"].aitems())
+        self.assertEqual([x.id for x in datasets], ["Dataset_1", "Dataset_2"])
+        self.assertTrue(datasets["Dataset_1"].parent is items["Collection_1"])
+        # Shared with the sync API, and the cursor has not moved
+        self.assertTrue(scraper.items is items)
+        self.assertTrue(scraper.current_item is scraper.root)
+
+    def test_afetch(self):
+        """Rows from a sync _fetch_data are normalized as by fetch()."""
+        scraper = Scraper()
+        dataset = scraper.get("Collection_1/Dataset_1")
+        data = asyncio.run(dataset.afetch())
+        self.assertEqual(len(data), 2500)
+        self.assertEqual(data[2499].value, 2499)
+        self.assertEqual(data[0]["municipality"].dimension,
+                         dataset.dimensions["municipality"])
+        # Cached for the sync API
+        self.assertTrue(dataset.fetch() is data)
+
+    def test_afetch_next(self):
+        scraper = Scraper()
+        dataset = scraper.get("Collection_1/Dataset_2")
+
+        async def collect():
+            return [x async for x in dataset.afetch_next(cache=True)]
+        results = asyncio.run(collect())
+        self.assertEqual(len(results), 2500)
+        self.assertEqual(len(dataset.fetch()), 2500)
+
+    def test_concurrent_requests(self):
+        """A native _afetch_data keeps many requests in flight."""
+        scraper = AsyncScraper()
+        datasets = scraper.get("Collection_1").items
+
+        async def fetch_all():
+            return await asyncio.gather(*[x.afetch() for x in datasets])
+        results = asyncio.run(fetch_all())
+        self.assertEqual([len(x) for x in results], [50, 50])
+        self.assertEqual(scraper.max_in_flight, 100)
+        self.assertEqual(results[1][49].value, 49)
@@ -1,4 +1,6 @@
 """Tests for scraper base class."""
+from threading import Barrier, Thread
+from time import sleep
 from unittest import TestCase
 from statscraper import (BaseScraper, Dataset, Dimension, Result,
                          DimensionValue, Collection, ROOT, NoSuchItem)
@@ -78,6 +80,28 @@ class CallbackScraper(Scraper):
         yield Dataset("Dataset_2")
 
 
+class ThreadedScraper(NestedScraper):
+    """A scraper where two threads fetch at the same time."""
+
+    def _fetch_data(self, dataset, query=None):
+        # Wait for the other thread to move its cursor
+        self.barrier.wait(timeout=5)
+        yield Result(1, {"dataset": self.current_item.id,
+                         "query": str(query)})
+
+
+class SlowValuesScraper(Scraper):
+    """A scraper taking a while to yield its allowed values."""
+
+    fetched = 0
+
+    def _fetch_allowed_values(self, dimension):
+        self.fetched += 1
+        for i in range(5):
+            sleep(0.01)
+            yield DimensionValue(str(i), dimension)
+
+
 class TestBaseScraper(TestCase):
     """Testing base functionality."""
 
@@ -161,6 +185,30 @@ class TestBaseScraper(TestCase):
         scraper.move_up().move_to("Dataset_2")
         self.assertEqual(data_1[0]["municipality"], "Robertsfors kommun")
 
+    def test_fetch_next(self):
+        """Stream results, without keeping them."""
+        scraper = Scraper()
+        dataset = scraper["Dataset_2"]
+        rows = list(dataset.fetch_next())
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["municipality"], "Umeå kommun")
+        self.assertEqual(len(rows[0].resultset), 0)
+        self.assertEqual(len(scraper.cache), 0)
+
+    def test_fetch_next_cached(self):
+        """Stream results into the cache, and then from the cache."""
+        scraper = Scraper()
+        dataset = scraper["Dataset_2"]
+        rows = list(dataset.fetch_next(cache=True))
+        self.assertEqual(len(dataset.data), 2)
+        self.assertTrue(dataset.data[0] is rows[0])
+
+        # Cached results are served without fetching again
+        def fail(*args, **kwargs):
+            raise AssertionError("Data fetched twice")
+        scraper._fetch_data = fail
+        self.assertEqual(list(dataset.fetch_next()), rows)
+
     def test_get_dimension(self):
         """Get dimensions for a dataset."""
         scraper = Scraper()
@@ -242,3 +290,126 @@ class TestBaseScraper(TestCase):
         """Extending the basescraper."""
         scraper = CallbackScraper()
         self.assertTrue(scraper.initiated)
+
+    def test_callbacks_per_class(self):
+        """Hooks only apply to the class they are defined in."""
+        class SubCallbackScraper(CallbackScraper):
+            @BaseScraper.on("init")
+            def more_initiation_code(self):
+                self.calls = getattr(self, "calls", 0) + 1
+
+        self.assertFalse(hasattr(Scraper(), "initiated"))
+        scraper = SubCallbackScraper()
+        self.assertTrue(scraper.initiated)
+        self.assertEqual(scraper.calls, 1)
+        self.assertEqual(len(SubCallbackScraper._get_hooks("init")), 2)
+        self.assertFalse(hasattr(CallbackScraper(), "calls"))
+
+    def test_overridden_callbacks(self):
+        """A hook method overridden in a subclass replaces the base one."""
+        class OverridingScraper(CallbackScraper):
+            def initiation_code(self):
+                self.initiated = "overridden"
+
+        class NoCallbackScraper(CallbackScraper):
+            initiation_code = None
+
+        self.assertEqual(OverridingScraper().initiated, "overridden")
+        self.assertTrue(CallbackScraper().initiated)
+        self.assertFalse(hasattr(NoCallbackScraper(), "initiated"))
+
+    def test_concurrent_fetch(self):
+        """Threads have cursors of their own."""
+        scraper = ThreadedScraper()
+        scraper.barrier = Barrier(2)
+        datasets = [scraper.root["Collection_1"]["Dataset_1"],
+                    scraper.root["Collection_2"]["Dataset_3"]]
+        results = {}
+
+        def fetch(dataset, query):
+            results[dataset.id] = dataset.fetch(query).list_of_dicts[0]
+
+        threads = [Thread(target=fetch, args=(dataset, {"q": i}))
+                   for i, dataset in enumerate(datasets)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results["Dataset_1"]["dataset"], "Dataset_1")
+        self.assertEqual(results["Dataset_1"]["query"], "{'q': 0}")
+        self.assertEqual(results["Dataset_3"]["dataset"], "Dataset_3")
+        self.assertEqual(results["Dataset_3"]["query"], "{'q': 1}")
+        # The cursor of this thread did not move
+        self.assertEqual(scraper.current_item.id, "Collection_2")
+
+    def test_concurrent_allowed_values(self):
+        """Threads never see allowed values that are still being loaded."""
+        scraper = SlowValuesScraper()
+        dimension = scraper["Dataset_1"].dimensions["gender"]
+        barrier = Barrier(4)
+        sizes = []
+
+        def count():
+            barrier.wait(timeout=5)
+            sizes.append(len(dimension.allowed_values))
+
+        threads = [Thread(target=count) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sizes, [5, 5, 5, 5])
+        self.assertEqual(scraper.fetched, 1)
+
+    def test_get_path(self):
+        """Get items by a path of ids."""
+        scraper = NestedScraper()
+        dataset = scraper.get("Collection_2/Dataset_3")
+        self.assertEqual(dataset.id, "Dataset_3")
+        self.assertTrue(scraper.get(["Collection_2", "Dataset_3"]) is dataset)
+        self.assertTrue(scraper.root["Collection_2"].get("Dataset_3")
+                        is dataset)
+        # No cursor walk needed without hooks
+        self.assertTrue(scraper.current_item is scraper.root["Collection_2"])
+        with self.assertRaises(NoSuchItem):
+            scraper.get("Collection_2/Dataset_1")
+        with self.assertRaises(NoSuchItem):
+            scraper.get("Collection_2/Dataset_3/Dataset_3")
+
+    def test_get_id_with_slashes(self):
+        """Ids containing slashes are found at the current position."""
+        class SlashScraper(NestedScraper):
+            def _fetch_itemslist(self, item):
+                if item.id == "Collection_2":
+                    yield Dataset("Temperature, 1/h")
+                else:
+                    for x in super(SlashScraper, self)._fetch_itemslist(item):
+                        yield x
+
+        scraper = SlashScraper()
+        collection = scraper.root.get("Collection_2")
+        dataset = collection.get("Temperature, 1/h")
+        self.assertEqual(dataset.id, "Temperature, 1/h")
+        scraper.move_to_top().move_to("Collection_2")
+        self.assertTrue(scraper.get("Temperature, 1/h") is dataset)
+        # ...and paths still work, from the top
+        self.assertEqual(scraper.get("Collection_1/Dataset_1").id,
+                         "Dataset_1")
+        self.assertTrue(scraper.get(["Collection_2", "Temperature, 1/h"])
+                        is dataset)
+
+    def test_get_path_with_hooks(self):
+        """Hooks fire only for the steps actually taken."""
+        class HookedScraper(NestedScraper):
+            @BaseScraper.on("select")
+            def count_select(self, id_):
+                self.selected = getattr(self, "selected", []) + [id_.id]
+
+        scraper = HookedScraper()
+        scraper.get("Collection_2/Dataset_2").data
+        self.assertEqual(scraper.selected, ["Collection_2", "Dataset_2"])
+        scraper.selected = []
+        # A sibling: One step up, and one down
+        scraper.get("Collection_2/Dataset_3").data
+        self.assertEqual(scraper.selected, ["Dataset_3"])
+        self.assertEqual(scraper.current_item.id, "Dataset_3")
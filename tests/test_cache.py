@@ -0,0 +1,165 @@
+"""Tests for result caches."""
+import pickle
+from unittest import TestCase
+from time import sleep
+from tempfile import mkdtemp
+from os.path import join
+from statscraper import (BaseScraper, Dataset, Dimension, Result, ResultSet,
+                         ResultCache, SQLiteResultCache)
+
+
+class Scraper(BaseScraper):
+    """A scraper with hardcoded yields."""
+
+    def _fetch_itemslist(self, item):
+        yield Dataset("Dataset_1")
+        yield Dataset("Dataset_2")
+
+    def _fetch_dimensions(self, dataset):
+        yield Dimension("municipality", datatype="region",
+                        dialect="skatteverket")
+
+    def _fetch_data(self, dataset, query=None):
+        yield Result(127, {"municipality": "2409"})
+        yield Result(17, {"municipality": "0980"})
+
+
+class Entry(ResultSet):
+    """A ResultSet with a fixed size."""
+
+    def __init__(self, nbytes):
+        super(Entry, self).__init__()
+        self._nbytes = nbytes
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+
+class TestResultCache(TestCase):
+
+    def test_lru(self):
+        """The least recently used entry is evicted first."""
+        cache = ResultCache(max_bytes=250)
+        cache.set("a", Entry(100))
+        cache.set("b", Entry(100))
+        cache.get("a")
+        cache.set("c", Entry(100))
+        self.assertTrue("a" in cache)
+        self.assertFalse("b" in cache)
+        self.assertTrue("c" in cache)
+        self.assertEqual(cache.stats["evictions"], 1)
+        self.assertEqual(cache.stats["bytes"], 200)
+
+    def test_lfu(self):
+        """The least frequently used entry is evicted first."""
+        cache = ResultCache(max_bytes=250, policy="lfu")
+        cache.set("a", Entry(100))
+        cache.set("b", Entry(100))
+        cache.get("a")
+        cache.get("b")
+        cache.get("b")
+        cache.get("a")
+        cache.get("b")
+        cache.set("c", Entry(100))
+        self.assertFalse("a" in cache)
+        self.assertTrue("b" in cache)
+
+    def test_too_large(self):
+        """Entries larger than the budget are not cached."""
+        cache = ResultCache(max_bytes=50)
+        cache.set("a", Entry(100))
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl(self):
+        """Entries expire."""
+        cache = ResultCache()
+        cache.set("a", Entry(100), ttl=0.01)
+        cache.set("b", Entry(100))
+        sleep(0.02)
+        self.assertEqual(cache.get("a"), None)
+        self.assertTrue(cache.get("b") is not None)
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["misses"], 1)
+
+    def test_size_estimate(self):
+        """ResultSets estimate their own size."""
+        small, large = ResultSet(), ResultSet()
+        small.append(Result(1, {}))
+        large.extend(Result(i, {}) for i in range(1000))
+        self.assertTrue(small.nbytes > 0)
+        self.assertTrue(large.nbytes > 100 * small.nbytes)
+
+    def test_scraper_cache(self):
+        """All datasets of a scraper share one cache."""
+        scraper = Scraper()
+        scraper.cache = ResultCache(max_bytes=10 ** 6)
+        dataset_1, dataset_2 = scraper.items
+        data = dataset_1.data
+        dataset_2.data
+        self.assertEqual(len(scraper.cache), 2)
+        self.assertTrue(dataset_1.data is data)
+        self.assertEqual(scraper.cache.stats["hits"], 1)
+        scraper.cache.clear()
+        self.assertFalse(dataset_1.data is data)
+
+
+class TestSQLiteResultCache(TestCase):
+
+    def setUp(self):
+        self.path = join(mkdtemp(), "cache.sqlite")
+
+    def test_persistence(self):
+        """Results are reused by a new scraper, without fetching."""
+        scraper = Scraper()
+        scraper.cache = SQLiteResultCache(self.path)
+        data = scraper["Dataset_1"].data
+
+        scraper = Scraper()
+        scraper.cache = SQLiteResultCache(self.path)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Data fetched twice")
+        scraper._fetch_data = fail
+        dataset = scraper["Dataset_1"]
+        cached = dataset.data
+        self.assertEqual(cached.list_of_dicts, data.list_of_dicts)
+        self.assertEqual(str(cached[0]["municipality"]), "Robertsfors kommun")
+        # Cached results are connected to the dataset again
+        self.assertTrue(cached.dataset is dataset)
+        self.assertEqual(str(cached.translate("scb")[0]["municipality"]),
+                         "2409 Robertsfors kommun")
+        self.assertEqual(scraper.cache.stats["hits"], 1)
+
+    def test_other_query(self):
+        """Different queries are cached separately."""
+        cache = SQLiteResultCache(self.path)
+        scraper = Scraper()
+        scraper.cache = cache
+        dataset = scraper["Dataset_1"]
+        dataset.fetch({"year": 2017})
+        self.assertEqual(len(cache), 1)
+        dataset.fetch({"year": 2018})
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl_and_invalidation(self):
+        """Entries expire, and can be removed."""
+        cache = SQLiteResultCache(self.path)
+        rs = ResultSet()
+        rs.append(Result(1, {}))
+        cache.set("a", rs, ttl=0.01)
+        cache.set("b", rs)
+        sleep(0.02)
+        self.assertEqual(cache.get("a"), None)
+        self.assertEqual(cache.get("b")[0].value, 1)
+        cache.invalidate("b")
+        self.assertFalse("b" in cache)
+
+    def test_pickle(self):
+        """A pickled cache opens its file again."""
+        cache = SQLiteResultCache(self.path)
+        rs = ResultSet()
+        rs.append(Result(1, {}))
+        cache.set("a", rs)
+        cache = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(cache.get("a")[0].value, 1)
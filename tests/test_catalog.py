@@ -0,0 +1,151 @@
+"""Tests for catalog snapshots."""
+import os
+from tempfile import mkdtemp
+from threading import Barrier
+from unittest import TestCase
+
+from statscraper import (BaseScraper, Collection, Dataset, Dimension,
+                         DimensionValue, Result, ROOT)
+
+
+class Station(DimensionValue):
+    """A dimension value with attributes of its own."""
+
+    def __init__(self, value, dimension, label=None, key=None):
+        super(Station, self).__init__(value, dimension, label=label)
+        self.key = key
+
+
+class Scraper(BaseScraper):
+    """A scraper counting its requests.
+
+    ROOT - Collection_1 - Dataset_1
+         - Collection_2 - [Dataset_2, Dataset_3]
+    """
+
+    labels = {}
+
+    def __init__(self, *args, **kwargs):
+        super(Scraper, self).__init__(*args, **kwargs)
+        self.requests = []
+
+    def _fetch_itemslist(self, item):
+        self.requests.append(item.id)
+        if item.id == ROOT:
+            yield Collection("Collection_1")
+            yield Collection("Collection_2",
+                             label=self.labels.get("Collection_2"))
+        elif item.id == "Collection_1":
+            yield Dataset("Dataset_1", blob={"updated": "2017"})
+        elif item.id == "Collection_2":
+            yield Dataset("Dataset_2")
+            yield Dataset("Dataset_3")
+
+    def _fetch_dimensions(self, dataset):
+        self.requests.append(dataset.id)
+        yield Dimension("municipality", datatype="region")
+        yield Dimension("gender", allowed_values=["male", "female"])
+        station = Dimension("station")
+        yield Dimension("station", allowed_values=[
+            Station("Abisko", station, key=188790).freeze()])
+
+    def _fetch_data(self, dataset, query=None):
+        yield Result(1, {"municipality": "Robertsfors kommun",
+                         "gender": "male"})
+
+
+class TestCatalog(TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(mkdtemp(), "test.catalog")
+        scraper = Scraper()
+        for dataset in scraper.descendants:
+            dataset.dimensions
+        scraper.save_catalog(self.path, dimensions=True)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_load_catalog(self):
+        """Items and dimensions are loaded without any requests."""
+        scraper = Scraper()
+        scraper.load_catalog(self.path)
+        dataset = scraper.get("Collection_1/Dataset_1")
+        self.assertEqual(dataset.blob, {"updated": "2017"})
+        self.assertTrue(dataset.parent is scraper.get(["Collection_1"]))
+        self.assertEqual([x.id for x in dataset.path],
+                         ["Collection_1", "Dataset_1"])
+        dimensions = dataset.dimensions
+        self.assertEqual(dimensions["municipality"].datatype.id, "region")
+        self.assertTrue("female" in dimensions["gender"].allowed_values)
+        self.assertEqual(len(scraper.get(["Collection_2"]).items), 2)
+        station = dimensions["station"].allowed_values[0]
+        self.assertTrue(isinstance(station, Station))
+        self.assertEqual(station.key, 188790)
+        self.assertEqual(str(station), "Abisko")
+        self.assertTrue(station.dimension is dimensions["station"])
+        with self.assertRaises(AttributeError):
+            station.value = "Kiruna"
+        self.assertEqual(scraper.requests, [])
+        self.assertEqual(dataset.data[0]["municipality"].dimension,
+                         dimensions["municipality"])
+
+    def test_wrong_scraper(self):
+        """Catalogs belong to one scraper class."""
+        class OtherScraper(Scraper):
+            pass
+        with self.assertRaises(ValueError):
+            OtherScraper().load_catalog(self.path)
+
+    def test_refresh_catalog(self):
+        """Only changed subtrees are thrown away."""
+        scraper = Scraper()
+        scraper.load_catalog(self.path)
+        dataset = scraper.get("Collection_1/Dataset_1")
+        scraper.labels = {"Collection_2": "New label"}
+        changed = scraper.refresh_catalog(depth=2)
+        self.assertEqual([x.id for x in changed], ["Collection_2"])
+        self.assertEqual(scraper.requests, [ROOT, "Collection_1"])
+        # Unchanged items are kept, along with their dimensions
+        self.assertTrue(scraper.get("Collection_1/Dataset_1") is dataset)
+        self.assertTrue(dataset._dimensions is not None)
+        # Changed ones are fetched again, when needed
+        self.assertEqual(scraper.get(["Collection_2"]).label, "New label")
+        scraper.get("Collection_2/Dataset_2")
+        self.assertEqual(scraper.requests[-1], "Collection_2")
+
+
+class SlowScraper(Scraper):
+    """A scraper where fetching items takes a while."""
+
+    def _fetch_itemslist(self, item):
+        if item.id.startswith("Collection"):
+            # Wait for a sibling, that is fetched at the same time
+            self.barrier.wait(timeout=5)
+        return super(SlowScraper, self)._fetch_itemslist(item)
+
+
+class TestCrawl(TestCase):
+
+    def test_crawl(self):
+        """Crawl the whole tree, fetching collections in parallel."""
+        scraper = SlowScraper()
+        scraper.barrier = Barrier(2)
+        datasets = list(scraper.crawl(max_workers=2))
+        self.assertEqual(sorted(x.id for x in datasets),
+                         ["Dataset_1", "Dataset_2", "Dataset_3"])
+        self.assertTrue(scraper.current_item is scraper.root)
+        self.assertEqual(len(scraper.requests), 3)
+        # The tree is loaded
+        self.assertTrue(scraper.get("Collection_2/Dataset_3") is
+                        [x for x in datasets if x.id == "Dataset_3"][0])
+        self.assertEqual(len(scraper.requests), 3)
+
+    def test_crawl_include(self):
+        """Skip subtrees, or stop at a depth."""
+        scraper = Scraper()
+        datasets = list(scraper.crawl(
+            include=lambda x: x.id != "Collection_2"))
+        self.assertEqual([x.id for x in datasets], ["Dataset_1"])
+        self.assertEqual(sorted(scraper.requests), [ROOT, "Collection_1"])
+        self.assertEqual(list(Scraper().crawl(max_depth=1)), [])
@@ -1,6 +1,8 @@
 """Tests related to the concept of certain datatypes having values with dialects."""
 from unittest import TestCase
-from statscraper import (BaseScraper, Dataset, Result, Dimension, DimensionValue)
+import numpy as np
+from statscraper import (BaseScraper, Dataset, Result, Dimension, DimensionValue,
+                         NoSuchDatatype, NoSuchItem)
 
 
 class Scraper(BaseScraper):
@@ -21,6 +23,31 @@ class Scraper(BaseScraper):
         })
 
 
+class DialectScraper(Scraper):
+    """A scraper with values in a foreign dialect."""
+
+    def _fetch_dimensions(self, dataset):
+        yield Dimension(u"municipality", datatype="region",
+                        dialect="skatteverket")
+
+    def _fetch_data(self, dataset, query=None):
+        for code in ["2409", "0980", "2409", "9999"]:
+            yield Result(1, {
+                "municipality": code,
+            })
+
+
+class UndeclaredDialectScraper(DialectScraper):
+    """A scraper with values in a dialect it does not tell us about."""
+
+    def _fetch_dimensions(self, dataset):
+        yield Dimension(u"municipality")
+
+
+class ColumnarUndeclaredDialectScraper(UndeclaredDialectScraper):
+    columnar = True
+
+
 class TestDialects(TestCase):
     """Test translated values."""
 
@@ -39,3 +66,114 @@ class TestDialects(TestCase):
 
         data2 = data1.translate("scb")
         self.assertEqual(str(data2[0]["municipality"]), "2409 Robertsfors kommun")
+
+    def test_normalization(self):
+        """Values in a foreign dialect are normalized when fetched."""
+        scraper = DialectScraper()
+        data = scraper.items[0].data
+        self.assertEqual(str(data[0]["municipality"]), "Robertsfors kommun")
+        self.assertEqual(str(data[1]["municipality"]), "Region Gotland")
+        self.assertEqual(str(data[2]["municipality"]), "Robertsfors kommun")
+        # Unknown values are left as they are
+        self.assertEqual(str(data[3]["municipality"]), "9999")
+
+    def test_detect_dialect(self):
+        """Guess the dialect of a dimension from its values."""
+        data = UndeclaredDialectScraper().items[0].data
+        candidates = data.detect_dialect("municipality")
+        datatype, dialect, coverage = candidates[0]
+        self.assertEqual((datatype.id, dialect), ("region", "skatteverket"))
+        self.assertAlmostEqual(coverage, 2 / 3.)
+        self.assertEqual(str(data[0]["municipality"]), "2409")
+        with self.assertRaises(NoSuchItem):
+            data.detect_dialect("no_such_dimension")
+
+    def test_apply_dialect(self):
+        """Normalize values in bulk, once the dialect is known."""
+        for scraper in (UndeclaredDialectScraper(),
+                        ColumnarUndeclaredDialectScraper()):
+            dataset = scraper.items[0]
+            data = dataset.data
+            data.detect_dialect("municipality", apply=True)
+            self.assertEqual(str(data[0]["municipality"]),
+                             "Robertsfors kommun")
+            self.assertEqual(str(data[3]["municipality"]), "9999")
+            self.assertTrue(data[0]["municipality"] is
+                            data[2]["municipality"])
+            dimension = dataset.dimensions["municipality"]
+            self.assertEqual(dimension.dialect, "skatteverket")
+            # Results added later are normalized too
+            data.append(Result(2, {"municipality": "0980"}))
+            self.assertEqual(str(data[-1]["municipality"]), "Region Gotland")
+
+
+class TestDatatypes(TestCase):
+    """Test the datatype registry."""
+
+    def test_shared_datatypes(self):
+        """Dimensions with the same datatype share one Datatype object."""
+        d1 = Dimension("municipality", datatype="region")
+        d2 = Dimension("county", datatype="region")
+        self.assertTrue(d1.datatype is d2.datatype)
+        self.assertTrue(d1.allowed_values is d2.allowed_values)
+        self.assertTrue("Ale kommun" in d1.allowed_values)
+
+    def test_immutable_datatypes(self):
+        """Shared datatypes can not be modified."""
+        datatype = Dimension("municipality", datatype="region").datatype
+        with self.assertRaises(AttributeError):
+            datatype.value_type = "int"
+
+    def test_missing_datatype(self):
+        """Asking for a datatype that does not exist."""
+        with self.assertRaises(NoSuchDatatype):
+            Dimension("municipality", datatype="no_such_datatype")
+
+    def test_translate_many(self):
+        """Translate a list or array of values in one go."""
+        datatype = Dimension("municipality", datatype="region").datatype
+        values = ["Robertsfors kommun", "Region Gotland"]
+        self.assertEqual(datatype.translate_many(values, "scb"),
+                         ["2409 Robertsfors kommun", "0980 Region Gotland"])
+        self.assertEqual(datatype.translate_many(np.array(values), "scb"),
+                         datatype.translate_many(values, "scb"))
+        self.assertEqual(datatype.translate_many(["Nowhere"], "scb",
+                                                 default=None), [None])
+        with self.assertRaises(NoSuchItem):
+            datatype.translate_many(["Nowhere"], "scb")
+        dv = DimensionValue("Robertsfors kommun",
+                            Dimension("municipality", datatype="region"))
+        self.assertEqual(dv.translate("scb"), "2409 Robertsfors kommun")
+
+    def test_convert(self):
+        """Convert values straight from one dialect to another."""
+        datatype = Dimension("municipality", datatype="region").datatype
+        self.assertEqual(datatype.convert(["1440", "1489"], "skatteverket",
+                                          "wikidata"),
+                         ["Q498470", "Q503162"])
+        self.assertEqual(datatype.convert(["Q498470"], "wikidata", "brå"),
+                         ["8617"])
+        self.assertEqual(datatype.convert(["1440"], "skatteverket", None),
+                         ["Ale kommun"])
+        self.assertEqual(datatype.convert(["Ale kommun"], None, "wikidata"),
+                         ["Q498470"])
+        self.assertEqual(datatype.convert(["9999"], "skatteverket",
+                                          "wikidata", default=None), [None])
+        with self.assertRaises(NoSuchItem):
+            datatype.convert(["9999"], "skatteverket", "wikidata")
+
+    def test_bundle(self):
+        """A compiled bundle holds the same values as the csv files."""
+        from tempfile import mkdtemp
+        from os.path import join
+        from statscraper import datatypes
+
+        path = datatypes.build_bundle(join(mkdtemp(), "datatypes.bundle"))
+        bundle = datatypes._read_bundle(path)
+        self.assertEqual(bundle["definitions"],
+                         datatypes._parse_definitions())
+        for domain, files in bundle["files"].items():
+            for file_ in files:
+                self.assertEqual(bundle["values"][file_],
+                                 datatypes._parse_values_file(
+                                     datatypes._abspath(file_)))
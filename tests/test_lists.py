@@ -0,0 +1,124 @@
+"""Tests for lists of items, dimensions and values."""
+import pickle
+from unittest import TestCase
+from statscraper import (Dimension, DimensionValue, DimensionList, ValueList,
+                         NoSuchItem, Result, Collection, Dataset, ItemList)
+from statscraper.BaseScraperList import INDEX_MIN_SIZE
+
+
+class TestLists(TestCase):
+    """Lookups by id, value and label."""
+
+    def setUp(self):
+        self.dimension = Dimension("gender")
+        self.values = ValueList()
+        self.values.append(DimensionValue("male", self.dimension, label="Men"))
+        self.values.append(DimensionValue("female", self.dimension,
+                                          label="Women"))
+
+    def test_lookup(self):
+        """Values can be found by value, label and identity."""
+        female = self.values[1]
+        self.assertTrue(self.values["female"] is female)
+        self.assertTrue(self.values.get_by_label("Women") is female)
+        self.assertTrue(female in self.values)
+        self.assertTrue("female" in self.values)
+        self.assertFalse("other" in self.values)
+        self.assertFalse(DimensionValue("female", self.dimension) in self.values)
+        with self.assertRaises(NoSuchItem):
+            self.values["other"]
+
+    def test_first_match(self):
+        """The first of two items with the same value is returned."""
+        duplicate = DimensionValue("female", self.dimension, label="Females")
+        self.values.append(duplicate)
+        self.assertTrue(self.values["female"] is self.values[1])
+        self.assertTrue(self.values.get_by_label("Females") is duplicate)
+
+    def test_modified_list(self):
+        """Lookups follow deleted, inserted and replaced items."""
+        self.assertTrue("female" in self.values)
+        del self.values[1]
+        self.assertFalse("female" in self.values)
+        other = DimensionValue("other", self.dimension)
+        self.values[0:1] = [other]
+        self.assertFalse("male" in self.values)
+        self.assertTrue(self.values["other"] is other)
+        self.values.insert(0, DimensionValue("female", self.dimension))
+        self.assertTrue(self.values["female"] is self.values[0])
+
+    def test_modified_item(self):
+        """Lookups follow items that were changed after being added."""
+        self.assertTrue(self.values.get_by_label("Women"))
+        self.values[1].label = "Ladies"
+        self.assertEqual(self.values.get_by_label("Ladies"), "female")
+        self.assertEqual(self.values.get_by_label("Women"), None)
+
+    def test_pickle(self):
+        """Lists are pickled with their attributes, without adding the
+        items again."""
+        items = ItemList()
+        items.scraper = None
+        items.collection = Collection("Collection")
+        items.append(Dataset("Dataset"))
+        copy = pickle.loads(pickle.dumps(items))
+        self.assertEqual(copy.collection.id, "Collection")
+        self.assertTrue(copy["Dataset"]._collection_path[0]
+                        is copy.collection)
+
+    def test_dimension_list(self):
+        """Dimensions are found by id."""
+        dimensions = DimensionList([Dimension("year")])
+        dimensions.extend([self.dimension])
+        self.assertTrue(dimensions["gender"] is self.dimension)
+        self.assertTrue("gender" in dimensions)
+        self.assertTrue(self.dimension in dimensions)
+
+
+class TestIndexedLists(TestCase):
+    """Lookups in lists long enough to be indexed."""
+
+    def setUp(self):
+        self.dimension = Dimension("year")
+        self.values = ValueList(
+            DimensionValue(str(x), self.dimension, label="Year %s" % x)
+            for x in range(1990, 1990 + INDEX_MIN_SIZE * 2))
+
+    def test_lookup(self):
+        value = self.values[5]
+        self.assertTrue(self.values["1995"] is value)
+        self.assertTrue(self.values.get_by_label("Year 1995") is value)
+        self.assertTrue(value in self.values)
+        self.assertFalse("1800" in self.values)
+        self.assertTrue(self.values._index is not None)
+        appended = DimensionValue("1800", self.dimension)
+        self.values.append(appended)
+        self.assertTrue(self.values["1800"] is appended)
+
+    def test_modified_item(self):
+        """Changed ids, values and labels are indexed again."""
+        self.assertFalse("1800" in self.values)
+        self.values[0].value = "1800"
+        self.values[1].label = "Year zero"
+        self.assertTrue(self.values["1800"] is self.values[0])
+        self.assertFalse("1990" in self.values)
+        self.assertTrue(self.values.get_by_label("Year zero")
+                        is self.values[1])
+        dimensions = DimensionList(Dimension(str(x))
+                                   for x in range(INDEX_MIN_SIZE))
+        self.assertFalse("other" in dimensions)
+        dimensions[0].id = "other"
+        self.assertTrue(dimensions["other"] is dimensions[0])
+
+    def test_pickle(self):
+        self.values["1995"]
+        copy = pickle.loads(pickle.dumps(self.values))
+        self.assertTrue("_index" not in copy.__dict__)
+        self.assertEqual(copy["1995"].label, "Year 1995")
+
+    def test_short_lists(self):
+        """Short lists, like the dimensions of a result, are not indexed."""
+        result = Result(1, {})
+        result.dimensionvalues.append(self.values[0])
+        self.assertTrue(result["year"] is self.values[0])
+        self.assertTrue(result.dimensionvalues._index is None)
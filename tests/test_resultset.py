@@ -1,8 +1,59 @@
-from unittest import TestCase
+import os
+import pickle
+from copy import deepcopy
+from tempfile import mkdtemp
+from unittest import TestCase, skipIf
 
-from statscraper import Result, ResultSet
+from statscraper import (BaseScraper, Dataset, Dimension, Result, ResultSet,
+                         ColumnarResultSet)
 from pandas.api import types as ptypes
 
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class Scraper(BaseScraper):
+    """A scraper with hardcoded yields."""
+
+    def _fetch_itemslist(self, item):
+        yield Dataset("Dataset_1")
+        yield Dataset("Dataset_2")
+
+    def _fetch_dimensions(self, dataset):
+        yield Dimension("municipality", datatype="region")
+        yield Dimension("year")
+
+    def _fetch_data(self, dataset, query=None):
+        if dataset.id == "Dataset_2":
+            # Only translatable dimensions
+            yield Result(127, {"municipality": "Robertsfors kommun"})
+            yield Result(12, {"municipality": "Robertsfors kommun"})
+            return
+        yield Result(127, {
+            "municipality": "Robertsfors kommun",
+            "year": "2017",
+        })
+        yield Result(17, {
+            "municipality": "Region Gotland",
+            "year": "2017",
+        })
+        yield Result(12, {
+            "municipality": "Robertsfors kommun",
+        })
+
+
+class ColumnarScraper(Scraper):
+    columnar = True
+
+
+class YearScraper(Scraper):
+    """A scraper with a typed year dimension."""
+
+    def _fetch_dimensions(self, dataset):
+        yield Dimension("year", datatype="year")
+
 
 class TestResultSet(TestCase):
 
@@ -12,3 +63,225 @@ class TestResultSet(TestCase):
         result.append(Result(45483, {'city': "Voi"}))
         df = result.pandas
         self.assertTrue(ptypes.is_numeric_dtype(df.value))
+
+    def test_pandas_categorical(self):
+        """Dimensions are exported as categoricals of allowed values."""
+        df = Scraper()["Dataset_1"].data.pandas
+        self.assertEqual(list(df.columns), ["value", "municipality", "year"])
+        self.assertEqual(df.municipality.dtype, "category")
+        categories = df.municipality.cat.categories
+        self.assertIn("Region Gotland", categories)
+        self.assertIn(u"Umeå kommun", categories)  # Allowed, but not in data
+        self.assertEqual(list(df.municipality)[1], "Region Gotland")
+        self.assertTrue(df.year.isnull()[2])
+
+    def test_pandas_value_type(self):
+        """Categories are coerced to the value_type of the datatype."""
+        df = YearScraper()["Dataset_1"].data.pandas
+        self.assertTrue(ptypes.is_integer_dtype(df.year.cat.categories))
+        self.assertEqual(df.year[0], 2017)
+
+    def test_pandas_invalidated(self):
+        """Appending results after export gives a new dataframe."""
+        data = Scraper()["Dataset_1"].data
+        self.assertEqual(len(data.pandas), 3)
+        data.append(Result(1, {"municipality": "Region Gotland"}))
+        self.assertEqual(len(data.pandas), 4)
+        data.extend([Result(2, {"year": "2018"})])
+        self.assertEqual(list(data.pandas.year)[-1], "2018")
+
+    def test_extend(self):
+        """Extend normalizes results just like append."""
+        dataset = Scraper()["Dataset_1"]
+        result = ResultSet()
+        result.dataset = dataset
+        result.extend([Result(1, {"municipality": "Region Gotland"}),
+                       Result(2, {"municipality": "Region Gotland",
+                                  "unknown": "foo"})])
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[1]["municipality"].dimension,
+                         dataset.dimensions["municipality"])
+        # Dimensions missing from the dataset keep their id
+        self.assertEqual(result[1].dict["unknown"], "foo")
+
+    def test_shared_dimension_values(self):
+        """Results with the same dimension value share one object."""
+        data = Scraper()["Dataset_1"].data
+        self.assertTrue(data[0]["municipality"] is data[2]["municipality"])
+        self.assertTrue(data[0]["year"] is data[1]["year"])
+        with self.assertRaises(AttributeError):
+            data[0]["municipality"].value = "Umeå kommun"
+        # Copies can be modified
+        dv = data[0]["municipality"].copy()
+        dv.value = "Umeå kommun"
+        self.assertEqual(str(data[2]["municipality"]), "Robertsfors kommun")
+
+    def test_compact_results(self):
+        """Results and dimension values have no per instance __dict__."""
+        data = Scraper()["Dataset_1"].data
+        self.assertFalse(hasattr(data[0], "__dict__"))
+        self.assertFalse(hasattr(data[0]["year"], "__dict__"))
+        self.assertTrue(repr(data[0]).startswith("<Result: 127"))
+        self.assertEqual(repr(data[0]["year"]), "<DimensionValue: 2017 (year)>")
+
+    def test_translate(self):
+        """Translating returns a new ResultSet, leaving this one as is."""
+        data = Scraper()["Dataset_2"].data
+        translated = data.translate("scb")
+        self.assertEqual(str(translated[0]["municipality"]),
+                         "2409 Robertsfors kommun")
+        self.assertEqual(str(data[0]["municipality"]), "Robertsfors kommun")
+        self.assertTrue(translated[0].resultset is translated)
+
+    def test_pickle(self):
+        """Fetched results can be pickled, with their scraper."""
+        scraper = Scraper()
+        dataset = scraper["Dataset_1"]
+        dataset.dimensions  # Creates a loading lock
+        data = pickle.loads(pickle.dumps(dataset.data))
+        self.assertEqual(data.list_of_dicts, dataset.data.list_of_dicts)
+        self.assertEqual(data[1]["municipality"].dimension.datatype.id,
+                         "region")
+        scraper = data.dataset.scraper
+        self.assertTrue(scraper.current_item is scraper.root)
+        self.assertTrue(scraper.cache.get(data.dataset._cache_key,
+                                          dataset=data.dataset) is not None)
+        self.assertEqual(len(scraper["Dataset_1"].data), 3)
+
+
+class TestColumnarResultSet(TestCase):
+
+    def test_columnar_storage(self):
+        """Columnar scrapers return a ColumnarResultSet."""
+        data = ColumnarScraper()["Dataset_1"].data
+        self.assertTrue(isinstance(data, ColumnarResultSet))
+        self.assertEqual(len(data), 3)
+        # One shared dictionary entry per distinct value
+        self.assertEqual(len(data._dictionaries["municipality"]), 2)
+        self.assertTrue(data[0]["municipality"] is data[2]["municipality"])
+
+    def test_same_as_row_storage(self):
+        """Columnar and row based storage should look the same."""
+        rows = Scraper()["Dataset_1"].data
+        columns = ColumnarScraper()["Dataset_1"].data
+        self.assertEqual(rows.list_of_dicts, columns.list_of_dicts)
+        self.assertEqual([x.tuple for x in rows], [x.tuple for x in columns])
+        self.assertEqual(columns[-1].value, 12)
+        self.assertEqual(str(columns[1]["municipality"]), "Region Gotland")
+
+    def test_list_methods(self):
+        """All list methods work on the rows, not on an empty list."""
+        rows = Scraper()["Dataset_1"].data
+        data = ColumnarScraper()["Dataset_1"].data
+        self.assertTrue(data == rows)
+        self.assertFalse(data == data[:2])
+        self.assertTrue(isinstance(data[:2], ColumnarResultSet))
+        self.assertEqual([x.value for x in data[1:]], [17, 12])
+        self.assertEqual([x.value for x in reversed(data)], [12, 17, 127])
+        self.assertEqual(data.index(data[1]), 1)
+        self.assertEqual(data.count(data[0]), 1)
+        self.assertTrue(data[2] in data)
+        self.assertFalse(Result(5, {}) in data)
+        with self.assertRaises(ValueError):
+            data.index(Result(5, {}))
+
+        self.assertEqual(data.pop().value, 12)
+        del data[0]
+        self.assertEqual([x.value for x in data], [17])
+        data.insert(0, Result(3, {"municipality": "Robertsfors kommun"}))
+        data.append(Result(30, {"year": "2018"}))
+        self.assertEqual([x.value for x in data], [3, 17, 30])
+        self.assertEqual(data[0]["municipality"].dimension,
+                         data.dataset.dimensions["municipality"])
+        data[1] = Result(4, {"year": "2016"})
+        self.assertEqual(data.list_of_dicts[1], {"value": 4, "year": "2016"})
+        data.sort(key=lambda x: -x.value)
+        self.assertEqual([x.value for x in data], [30, 4, 3])
+        data.remove(data[1])
+        self.assertEqual([x.value for x in data], [30, 3])
+        self.assertEqual(str(data[0]["year"]), "2018")
+        data.reverse()
+        self.assertEqual([x.value for x in data], [3, 30])
+        data.clear()
+        self.assertEqual(len(data), 0)
+
+    def test_pickle(self):
+        """Only the columns are pickled, rows are not added again."""
+        data = ColumnarScraper()["Dataset_1"].data
+        unpickled = pickle.loads(pickle.dumps(data))
+        self.assertTrue(isinstance(unpickled, ColumnarResultSet))
+        self.assertEqual(unpickled.list_of_dicts, data.list_of_dicts)
+        self.assertEqual(unpickled[1]["municipality"].dimension.id,
+                         "municipality")
+
+    def test_deepcopy(self):
+        data = ColumnarScraper()["Dataset_1"].data
+        copied = deepcopy(data)
+        self.assertEqual(len(copied), 3)
+        self.assertEqual(copied.list_of_dicts, data.list_of_dicts)
+        copied.append(Result(30, {"year": "2018"}))
+        self.assertEqual(len(data), 3)
+
+    def test_pandas_export(self):
+        """Get columnar results as pandas dataframe."""
+        df = ColumnarScraper()["Dataset_1"].data.pandas
+        self.assertTrue(ptypes.is_numeric_dtype(df.value))
+        self.assertEqual(list(df.columns), ["value", "municipality", "year"])
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df.municipality.dtype, "category")
+        rows = Scraper()["Dataset_1"].data.pandas
+        self.assertTrue(df.equals(rows))
+
+    def test_translate(self):
+        """Translate only touches the dictionaries."""
+        data = ColumnarScraper()["Dataset_2"].data
+        translated = data.translate("scb")
+        self.assertEqual(str(translated[0]["municipality"]),
+                         "2409 Robertsfors kommun")
+        self.assertEqual(str(data[0]["municipality"]), "Robertsfors kommun")
+
+
+@skipIf(pyarrow is None, "pyarrow is not installed")
+class TestArrow(TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(mkdtemp(), "data.parquet")
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_to_arrow(self):
+        """Dimensions are dictionary encoded, and described in metadata."""
+        for scraper in (Scraper(), ColumnarScraper()):
+            table = scraper["Dataset_1"].data.to_arrow()
+            self.assertEqual(table.column_names,
+                             ["value", "municipality", "year"])
+            self.assertTrue(pyarrow.types.is_dictionary(
+                table.schema.field("municipality").type))
+            self.assertEqual(table.column("year").null_count, 1)
+            metadata = table.schema.metadata[b"statscraper"].decode("utf-8")
+            self.assertIn('"datatype": "region"', metadata)
+
+    def test_parquet_roundtrip(self):
+        """Results written to Parquet read back the same."""
+        data = Scraper()["Dataset_1"].data
+        data.to_parquet(self.path)
+        for cls in (ResultSet, ColumnarResultSet):
+            loaded = cls.from_parquet(self.path)
+            self.assertTrue(type(loaded) is cls)
+            self.assertEqual(loaded.list_of_dicts, data.list_of_dicts)
+            self.assertEqual(loaded[0]["municipality"].dimension.datatype.id,
+                             "region")
+            self.assertTrue(loaded[0]["municipality"] is
+                            loaded[2]["municipality"])
+
+    def test_parquet_translate(self):
+        """Reloaded results can be translated."""
+        dataset = ColumnarScraper()["Dataset_2"]
+        dataset.data.to_parquet(self.path)
+        for loaded in (ResultSet.from_parquet(self.path),
+                       ResultSet.from_parquet(self.path, dataset=dataset)):
+            translated = loaded.translate("scb")
+            self.assertEqual(str(translated[0]["municipality"]),
+                             "2409 Robertsfors kommun")
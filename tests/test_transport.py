@@ -0,0 +1,311 @@
+"""Tests for the shared HTTP transport."""
+import asyncio
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Lock, Thread
+from time import monotonic, sleep
+from unittest import TestCase
+
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from statscraper import (BaseScraper, Transport, SQLiteHTTPCache,
+                         FileHTTPCache, RateLimiter)
+from statscraper.scrapers import SCB
+
+
+class RecordingAdapter(BaseAdapter):
+    """Answers every request with an empty 200, remembering the request."""
+
+    def __init__(self):
+        super(RecordingAdapter, self).__init__()
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append((request, kwargs))
+        response = Response()
+        response.status_code = 200
+        response.request = request
+        response.url = request.url
+        response._content = b"{}"
+        return response
+
+    def close(self):
+        pass
+
+
+class ETagAdapter(RecordingAdapter):
+    """Answers with 304 Not Modified if the ETag is still the same."""
+
+    etag = '"1"'
+    etag_header = "ETag"
+
+    def send(self, request, **kwargs):
+        response = super(ETagAdapter, self).send(request, **kwargs)
+        if request.headers.get("If-None-Match") == self.etag:
+            response.status_code = 304
+            response._content = b""
+        response.headers[self.etag_header] = self.etag
+        return response
+
+
+class SlowAdapter(RecordingAdapter):
+    """Takes a while to answer, keeping track of requests in flight.
+
+    The first `throttle` requests are answered with 429.
+    """
+
+    def __init__(self, throttle=0, retry_after="0"):
+        super(SlowAdapter, self).__init__()
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.times.append(monotonic())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        sleep(0.01)
+        response = super(SlowAdapter, self).send(request, **kwargs)
+        with self.lock:
+            self.in_flight -= 1
+            if self.throttle:
+                self.throttle -= 1
+                response.status_code = 429
+                response.headers["Retry-After"] = self.retry_after
+        return response
+
+
+class TestTransport(TestCase):
+
+    def test_pool_sizes(self):
+        """Every host gets a pool of keep-alive connections."""
+        transport = Transport(pool_size=4,
+                              pool_sizes={"https://api.scb.se": 20})
+        adapter = transport.session.get_adapter("https://example.com/a")
+        self.assertEqual(adapter._pool_maxsize, 4)
+        adapter = transport.session.get_adapter("https://api.scb.se/OV0104")
+        self.assertEqual(adapter._pool_maxsize, 20)
+
+    def test_defaults(self):
+        """Default headers and timeouts are used for every request."""
+        transport = Transport(timeout=5, headers={"X-Test": "yes"})
+        adapter = RecordingAdapter()
+        transport.session.mount("https://", adapter)
+        self.assertEqual(transport.get("https://example.com").json(), {})
+        transport.post("https://example.com", json={"a": 1}, timeout=1)
+        (get, get_kwargs), (post, post_kwargs) = adapter.requests
+        self.assertEqual(get.headers["X-Test"], "yes")
+        self.assertTrue(get.headers["User-Agent"].startswith("statscraper"))
+        self.assertEqual(get_kwargs["timeout"], 5)
+        self.assertEqual(post.method, "POST")
+        self.assertEqual(post.body, b'{"a": 1}')
+        self.assertEqual(post_kwargs["timeout"], 1)
+
+    def test_scraper_transport(self):
+        """A scraper has one transport, shared by all threads."""
+        scraper = BaseScraper()
+        transports = []
+        threads = [Thread(target=lambda: transports.append(scraper.transport))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(x is scraper.transport for x in transports))
+        self.assertFalse(BaseScraper().transport is scraper.transport)
+        transport = Transport()
+        scraper.transport = transport
+        self.assertTrue(scraper.transport is transport)
+
+    def test_async_requests(self):
+        """Async requests are made over the same session, at the same time."""
+        transport = Transport(max_in_flight=20)
+        adapter = RecordingAdapter()
+        transport.session.mount("https://", adapter)
+
+        async def get_all():
+            return await asyncio.gather(*[
+                transport.aget("https://example.com/%s" % i)
+                for i in range(50)])
+        responses = asyncio.run(get_all())
+        self.assertEqual([x.url for x in responses],
+                         ["https://example.com/%s" % i for i in range(50)])
+        self.assertEqual(len(adapter.requests), 50)
+
+
+class TestHTTPCache(TestCase):
+
+    def setUp(self):
+        self.directory = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def _transport(self, cache, namespace="test"):
+        transport = Transport(cache=cache, namespace=namespace)
+        adapter = ETagAdapter()
+        transport.session.mount("https://", adapter)
+        return transport, adapter
+
+    def _test_cache(self, cache):
+        transport, adapter = self._transport(cache)
+        r = transport.get("https://example.com", params={"a": 1})
+        self.assertFalse(r.from_cache)
+        r = transport.get("https://example.com?a=1")
+        self.assertTrue(r.from_cache)
+        self.assertEqual(r.json(), {})
+        self.assertEqual(r.headers["etag"], '"1"')
+        self.assertEqual(len(adapter.requests), 1)
+        # POST requests are never cached
+        transport.post("https://example.com?a=1")
+        self.assertEqual(len(adapter.requests), 2)
+        self.assertEqual(transport.stats, {"requests": 2, "hits": 1,
+                                           "misses": 1, "revalidated": 0,
+                                           "throttled": 0})
+        # Other namespaces have caches of their own
+        other, adapter = self._transport(cache, namespace="other")
+        self.assertFalse(other.get("https://example.com?a=1").from_cache)
+        self.assertEqual(len(adapter.requests), 1)
+
+    def test_sqlite_cache(self):
+        cache = SQLiteHTTPCache(os.path.join(self.directory, "http.sqlite"))
+        self._test_cache(cache)
+        self.assertEqual(len(cache), 2)
+        cache.clear("other")
+        self.assertEqual(len(cache), 1)
+
+    def test_file_cache(self):
+        cache = FileHTTPCache(os.path.join(self.directory, "http"))
+        self._test_cache(cache)
+        self.assertEqual(len(cache), 2)
+        cache.clear("other")
+        self.assertEqual(len(cache), 1)
+
+    def test_revalidation(self):
+        """Expired responses are revalidated with conditional requests."""
+        cache = SQLiteHTTPCache(os.path.join(self.directory, "http.sqlite"),
+                                ttl=0)
+        transport, adapter = self._transport(cache)
+        transport.get("https://example.com")
+        r = transport.get("https://example.com")
+        self.assertTrue(r.from_cache)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), {})
+        request, kwargs = adapter.requests[-1]
+        self.assertEqual(request.headers["If-None-Match"], '"1"')
+        adapter.etag = '"2"'
+        self.assertFalse(transport.get("https://example.com").from_cache)
+        self.assertEqual(transport.stats, {"requests": 3, "hits": 0,
+                                           "misses": 2, "revalidated": 1,
+                                           "throttled": 0})
+
+    def test_revalidation_lowercase_headers(self):
+        """Servers may send header names in lower case."""
+        cache = SQLiteHTTPCache(os.path.join(self.directory, "http.sqlite"),
+                                ttl=0)
+        transport, adapter = self._transport(cache)
+        adapter.etag_header = "etag"
+        transport.get("https://example.com")
+        self.assertTrue(transport.get("https://example.com").from_cache)
+        request, kwargs = adapter.requests[-1]
+        self.assertEqual(request.headers["If-None-Match"], '"1"')
+        self.assertEqual(transport.stats["revalidated"], 1)
+
+    def test_scraper_namespace(self):
+        """Scrapers opt in per class, and share a cache by class."""
+        class CachedScraper(BaseScraper):
+            http_cache = FileHTTPCache(self.directory)
+        transport = CachedScraper().transport
+        self.assertTrue(transport.cache is CachedScraper.http_cache)
+        self.assertTrue(transport.namespace.endswith(".CachedScraper"))
+        self.assertTrue(BaseScraper().transport.cache is None)
+        # Transports of our own get the cache of the class
+        scraper = CachedScraper()
+        scraper.transport = Transport(pool_size=50)
+        self.assertTrue(scraper.transport.cache is CachedScraper.http_cache)
+        self.assertEqual(scraper.transport.namespace, transport.namespace)
+
+
+class TestRateLimiter(TestCase):
+
+    def _get_all(self, transport, n):
+        def get(i):
+            transport.get("https://example.com/%s" % i)
+        threads = [Thread(target=get, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_quota(self):
+        """No period ever sees more requests than the quota."""
+        transport = Transport(
+            rate_limits={"example.com": RateLimiter(3, 0.2)})
+        adapter = SlowAdapter()
+        transport.session.mount("https://", adapter)
+        self._get_all(transport, 7)
+        times = sorted(adapter.times)
+        self.assertEqual(len(times), 7)
+        for i in range(len(times) - 3):
+            self.assertTrue(times[i + 3] - times[i] >= 0.2)
+        # ...but the quota is used
+        self.assertTrue(times[-1] - times[0] < 0.6)
+
+    def test_max_in_flight(self):
+        transport = Transport(
+            rate_limits={"example.com": RateLimiter(100, 1, max_in_flight=2)})
+        adapter = SlowAdapter()
+        transport.session.mount("https://", adapter)
+        self._get_all(transport, 8)
+        self.assertEqual(adapter.max_in_flight, 2)
+        # Other hosts are not limited
+        self.assertEqual(transport.rate_limits.get("example.org"), None)
+
+    def test_retry_after(self):
+        """Throttled requests are retried after the time asked for."""
+        transport = Transport(
+            rate_limits={"example.com": RateLimiter(10, 1)})
+        adapter = SlowAdapter(throttle=2, retry_after="0.1")
+        transport.session.mount("https://", adapter)
+        start = monotonic()
+        r = transport.get("https://example.com")
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(monotonic() - start >= 0.2)
+        self.assertEqual(transport.stats["throttled"], 2)
+        self.assertEqual(transport.stats["requests"], 3)
+
+    def test_max_backoffs(self):
+        transport = Transport(max_backoffs=1)
+        adapter = SlowAdapter(throttle=5)
+        transport.session.mount("https://", adapter)
+        self.assertEqual(transport.get("https://example.com").status_code, 429)
+        self.assertEqual(len(adapter.times), 2)
+
+    def test_scraper_rate_limits(self):
+        """Scrapers of a class share its rate limits."""
+        limiter = RateLimiter(10, 10)
+
+        class LimitedScraper(BaseScraper):
+            rate_limits = {"example.com": limiter}
+        self.assertTrue(LimitedScraper().transport.rate_limits["example.com"]
+                        is LimitedScraper().transport.rate_limits["example.com"])
+
+    def test_custom_transport(self):
+        """A transport of our own keeps to the quota of the class."""
+        scraper = SCB()
+        limiter = scraper.transport.rate_limits["api.scb.se"]
+        scraper.transport = Transport(pool_size=50, timeout=30)
+        self.assertTrue(scraper.transport.rate_limits["api.scb.se"]
+                        is limiter)
+        # ...unless it has a limit of its own for the host
+        own_limiter = RateLimiter(1, 1)
+        scraper.transport = Transport(
+            rate_limits={"api.scb.se": own_limiter})
+        self.assertTrue(scraper.transport.rate_limits["api.scb.se"]
+                        is own_limiter)